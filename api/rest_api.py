@@ -195,7 +195,7 @@ async def register(user_data: UserCreate):
         'email': user_data.email,
         'username': user_data.username,
         'full_name': user_data.full_name,
-        'password_hash': security_system.hash_password(user_data.password),
+        'password_hash': await security_system.hash_password_async(user_data.password),
         'created_at': datetime.utcnow().isoformat(),
         'last_login': None,
         'is_active': True,
@@ -238,12 +238,16 @@ async def login(login_data: UserLogin):
         )
     
     # Verify password
-    if not security_system.verify_password(login_data.password, user['password_hash']):
+    if not await security_system.verify_password_async(login_data.password, user['password_hash']):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
+    # Upgrade legacy password hashes now that the plaintext is verified
+    if security_system.password_needs_rehash(user['password_hash']):
+        user['password_hash'] = await security_system.hash_password_async(login_data.password)
+    
     # Update last login
     user['last_login'] = datetime.utcnow().isoformat()
     
@@ -6,13 +6,30 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import json
+import asyncio
+import functools
+import threading
+import time
+import google.auth
 from google.cloud import compute_v1
+from google.cloud import functions_v1
 from google.cloud import storage
+from gcloud.aio.storage import Storage as AsyncStorage
 from google.cloud import monitoring_v3
-from google.api_core.exceptions import GoogleAPICallError
+from google.api_core.exceptions import GoogleAPICallError, from_http_status
 
 logger = logging.getLogger(__name__)
 
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+BUCKET_PREFIX = 'vt-ultra-pro'
+
+# Partial-response field masks: only decode the instance fields we actually read
+INSTANCE_GET_FIELDS = 'status,networkInterfaces(networkIP,accessConfigs(natIP)),creationTimestamp'
+INSTANCE_LIST_FIELDS = (
+    'items(name,status,machineType,networkInterfaces(networkIP,accessConfigs(natIP)),'
+    'creationTimestamp,labels),nextPageToken'
+)
+
 class GCPWorkerManager:
     """GCP cloud integration and worker management"""
     
@@ -25,20 +42,112 @@ class GCPWorkerManager:
         self.compute_client = None
         self.storage_client = None
         self.monitoring_client = None
+        self.zone_operations_client = None
+        self.global_operations_client = None
+        self.images_client = None
+        self.templates_client = None
+        self.mig_client = None
+        self.autoscaler_client = None
+        self.functions_client = None
+        self.aio_storage = None
+        self._compute_credentials = None
+        self._status_cache: Dict[tuple, tuple] = {}
         
         self._initialize_clients()
         logger.info(f"GCP Worker Manager initialized for project: {project_id}")
     
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
+    async def close(self):
+        """Close the loop-bound async storage session and monitoring channel"""
+        if self.aio_storage is not None:
+            await self.aio_storage.close()
+            self.aio_storage = None
+        if self.monitoring_client is not None:
+            await self.monitoring_client.transport.close()
+            self.monitoring_client = None
+    
     def _initialize_clients(self):
         """Initialize GCP clients"""
         try:
-            self.compute_client = compute_v1.InstancesClient()
+            # One credentials object for every compute client: a single token
+            # refresh path instead of one per client
+            self._compute_credentials, _ = google.auth.default()
+            credentials = self._compute_credentials
+            
+            self.compute_client = compute_v1.InstancesClient(credentials=credentials)
+            self.zone_operations_client = compute_v1.ZoneOperationsClient(credentials=credentials)
+            self.global_operations_client = compute_v1.GlobalOperationsClient(credentials=credentials)
+            self.images_client = compute_v1.ImagesClient(credentials=credentials)
+            self.templates_client = compute_v1.InstanceTemplatesClient(credentials=credentials)
+            self.mig_client = compute_v1.InstanceGroupManagersClient(credentials=credentials)
+            self.autoscaler_client = compute_v1.AutoscalersClient(credentials=credentials)
             self.storage_client = storage.Client(project=self.project_id)
-            self.monitoring_client = monitoring_v3.MetricServiceClient()
+            self.functions_client = functions_v1.CloudFunctionsServiceClient()
             
         except Exception as e:
             logger.error(f"Failed to initialize GCP clients: {e}")
             raise
+        
+        self._warm_up_clients()
+    
+    def _warm_up_clients(self):
+        """Open client channels in the background so the first real call skips setup"""
+        warmups = [
+            # Page size is only accepted on the request object, not as a flattened kwarg
+            lambda: self.compute_client.list(
+                request={'project': self.project_id, 'zone': self.zone, 'max_results': 1}
+            ),
+            lambda: self.storage_client.list_buckets(max_results=1)
+        ]
+        
+        for warmup in warmups:
+            threading.Thread(
+                target=self._run_warmup,
+                args=(warmup,),
+                daemon=True
+            ).start()
+    
+    def _run_warmup(self, warmup):
+        """Run a single cheap warm-up call, ignoring failures"""
+        try:
+            # Pagers are lazy; pull the first item to force the round-trip
+            next(iter(warmup()), None)
+        except Exception as e:
+            logger.debug(f"GCP client warm-up failed: {e}")
+    
+    async def _wait_op(self, operation, global_op: bool = False):
+        """Wait for a compute operation using the server-side long-poll wait RPC"""
+        while True:
+            if global_op:
+                result = await asyncio.to_thread(
+                    self.global_operations_client.wait,
+                    project=self.project_id,
+                    operation=operation.name
+                )
+            else:
+                result = await asyncio.to_thread(
+                    self.zone_operations_client.wait,
+                    project=self.project_id,
+                    zone=self.zone,
+                    operation=operation.name
+                )
+            
+            # wait() returns after ~2 minutes even if the operation is still running
+            if result.status == compute_v1.Operation.Status.DONE:
+                break
+        
+        if result.error and result.error.errors:
+            raise from_http_status(
+                result.http_error_status_code or 500,
+                result.http_error_message or str(result.error.errors[0].message)
+            )
+        
+        return result
     
     async def create_vm_instance(self, instance_name: str,
                                machine_type: str = 'e2-medium',
@@ -50,8 +159,8 @@ class GCPWorkerManager:
         """Create a new VM instance"""
         try:
             # Get the latest image
-            image_client = compute_v1.ImagesClient()
-            image = image_client.get_from_family(
+            image = await asyncio.to_thread(
+                self.images_client.get_from_family,
                 project=image_project,
                 family=image_family
             )
@@ -103,20 +212,23 @@ class GCPWorkerManager:
             }
             
             # Create the instance
-            operation = self.compute_client.insert(
+            operation = await asyncio.to_thread(
+                self.compute_client.insert,
                 project=self.project_id,
                 zone=self.zone,
                 instance_resource=instance
             )
             
             # Wait for operation to complete
-            operation.result()
+            await self._wait_op(operation)
             
             # Get the created instance
-            created_instance = self.compute_client.get(
+            created_instance = await asyncio.to_thread(
+                self.compute_client.get,
                 project=self.project_id,
                 zone=self.zone,
-                instance=instance_name
+                instance=instance_name,
+                metadata=[('x-goog-fieldmask', INSTANCE_GET_FIELDS)]
             )
             
             logger.info(f"Created VM instance: {instance_name}")
@@ -145,8 +257,6 @@ class GCPWorkerManager:
                                      startup_script: str = None) -> Dict[str, Any]:
         """Create instance template for managed instance groups"""
         try:
-            template_client = compute_v1.InstanceTemplatesClient()
-            
             # Configure the template
             template = compute_v1.InstanceTemplate()
             template.name = template_name
@@ -158,9 +268,8 @@ class GCPWorkerManager:
             # Disk configuration
             disk = compute_v1.AttachedDisk()
             initialize_params = compute_v1.AttachedDiskInitializeParams()
-            
-            image_client = compute_v1.ImagesClient()
-            image = image_client.get_from_family(
+            image = await asyncio.to_thread(
+                self.images_client.get_from_family,
                 project=image_project,
                 family=image_family
             )
@@ -208,12 +317,13 @@ class GCPWorkerManager:
             template.properties = properties
             
             # Create the template
-            operation = template_client.insert(
+            operation = await asyncio.to_thread(
+                self.templates_client.insert,
                 project=self.project_id,
                 instance_template_resource=template
             )
             
-            operation.result()
+            await self._wait_op(operation, global_op=True)
             
             logger.info(f"Created instance template: {template_name}")
             
@@ -234,8 +344,6 @@ class GCPWorkerManager:
                                           autoscaling: bool = True) -> Dict[str, Any]:
         """Create managed instance group"""
         try:
-            mig_client = compute_v1.InstanceGroupManagersClient()
-            
             # Create the managed instance group
             mig = compute_v1.InstanceGroupManager()
             mig.name = group_name
@@ -256,13 +364,14 @@ class GCPWorkerManager:
             mig.auto_healing_policies = [auto_healing_policies]
             
             # Create the MIG
-            operation = mig_client.insert(
+            operation = await asyncio.to_thread(
+                self.mig_client.insert,
                 project=self.project_id,
                 zone=self.zone,
                 instance_group_manager_resource=mig
             )
             
-            operation.result()
+            await self._wait_op(operation)
             
             # Configure autoscaling if enabled
             if autoscaling:
@@ -285,8 +394,6 @@ class GCPWorkerManager:
     async def configure_autoscaling(self, group_name: str):
         """Configure autoscaling for instance group"""
         try:
-            autoscaler_client = compute_v1.AutoscalersClient()
-            
             autoscaler = compute_v1.Autoscaler()
             autoscaler.name = f'{group_name}-autoscaler'
             autoscaler.target = (
@@ -304,13 +411,14 @@ class GCPWorkerManager:
             autoscaler.autoscaling_policy.cpu_utilization.utilization_target = 0.7
             
             # Create autoscaler
-            operation = autoscaler_client.insert(
+            operation = await asyncio.to_thread(
+                self.autoscaler_client.insert,
                 project=self.project_id,
                 zone=self.zone,
                 autoscaler_resource=autoscaler
             )
             
-            operation.result()
+            await self._wait_op(operation)
             logger.info(f"Configured autoscaling for {group_name}")
             
         except GoogleAPICallError as e:
@@ -329,6 +437,9 @@ class GCPWorkerManager:
                     location=location
                 )
             
+            # Label for identification alongside the name prefix
+            bucket.labels = {'app': 'vt-ultra-pro'}
+            
             # Configure versioning
             if versioning:
                 bucket.versioning_enabled = True
@@ -349,6 +460,7 @@ class GCPWorkerManager:
             bucket.lifecycle_rules = lifecycle_rules
             bucket.patch()
             
+            self._invalidate_status('storage')
             logger.info(f"Created Cloud Storage bucket: {bucket_name}")
             
             return {
@@ -369,10 +481,6 @@ class GCPWorkerManager:
                                   trigger_http: bool = True) -> Dict[str, Any]:
         """Deploy Cloud Function"""
         try:
-            from google.cloud import functions_v1
-            
-            functions_client = functions_v1.CloudFunctionsServiceClient()
-            
             # Prepare function configuration
             function = functions_v1.CloudFunction()
             function.name = f'projects/{self.project_id}/locations/{self.region}/functions/{function_name}'
@@ -399,14 +507,16 @@ class GCPWorkerManager:
                 pass
             
             # Deploy the function
-            operation = functions_client.create_function(
+            operation = await asyncio.to_thread(
+                self.functions_client.create_function,
                 location=f'projects/{self.project_id}/locations/{self.region}',
                 function=function
             )
             
             # Wait for deployment
-            response = operation.result()
+            response = await asyncio.to_thread(operation.result)
             
+            self._invalidate_status('functions')
             logger.info(f"Deployed Cloud Function: {function_name}")
             
             return {
@@ -527,11 +637,14 @@ class GCPWorkerManager:
             project_name = f'projects/{self.project_id}'
             
             # Build filter
-            filter_str = f'resource.type="gce_instance" AND metric.type="{metric_type}"'
+            filter_parts = ['resource.type="gce_instance"', f'metric.type="{metric_type}"']
             
             if filter_labels:
-                for key, value in filter_labels.items():
-                    filter_str += f' AND resource.labels.{key}="{value}"'
+                filter_parts.extend(
+                    f'resource.labels.{key}="{value}"' for key, value in filter_labels.items()
+                )
+            
+            filter_str = ' AND '.join(filter_parts)
             
             # Set time interval
             now = datetime.utcnow()
@@ -543,7 +656,7 @@ class GCPWorkerManager:
             })
             
             # Query metrics
-            results = self.monitoring_client.list_time_series(
+            results = await self._get_monitoring_client().list_time_series(
                 name=project_name,
                 filter=filter_str,
                 interval=interval,
@@ -551,7 +664,7 @@ class GCPWorkerManager:
             )
             
             time_series_data = []
-            for series in results:
+            async for series in results:
                 points = []
                 for point in series.points:
                     points.append({
@@ -587,23 +700,24 @@ class GCPWorkerManager:
             if action == 'start':
                 if instance_names:
                     for instance_name in instance_names:
-                        operation = self.compute_client.start(
+                        operation = await asyncio.to_thread(
+                            self.compute_client.start,
                             project=self.project_id,
                             zone=self.zone,
                             instance=instance_name
                         )
-                        operation.result()
+                        await self._wait_op(operation)
                     message = f"Started instances: {instance_names}"
                 elif group_name:
                     # Start all instances in group
-                    mig_client = compute_v1.InstanceGroupManagersClient()
-                    operation = mig_client.resize(
+                    operation = await asyncio.to_thread(
+                        self.mig_client.resize,
                         project=self.project_id,
                         zone=self.zone,
                         instance_group_manager=group_name,
                         size=2  # Default size
                     )
-                    operation.result()
+                    await self._wait_op(operation)
                     message = f"Started instance group: {group_name}"
                 else:
                     message = "Specify instance names or group name"
@@ -611,23 +725,24 @@ class GCPWorkerManager:
             elif action == 'stop':
                 if instance_names:
                     for instance_name in instance_names:
-                        operation = self.compute_client.stop(
+                        operation = await asyncio.to_thread(
+                            self.compute_client.stop,
                             project=self.project_id,
                             zone=self.zone,
                             instance=instance_name
                         )
-                        operation.result()
+                        await self._wait_op(operation)
                     message = f"Stopped instances: {instance_names}"
                 elif group_name:
                     # Stop all instances in group
-                    mig_client = compute_v1.InstanceGroupManagersClient()
-                    operation = mig_client.resize(
+                    operation = await asyncio.to_thread(
+                        self.mig_client.resize,
                         project=self.project_id,
                         zone=self.zone,
                         instance_group_manager=group_name,
                         size=0
                     )
-                    operation.result()
+                    await self._wait_op(operation)
                     message = f"Stopped instance group: {group_name}"
                 else:
                     message = "Specify instance names or group name"
@@ -635,12 +750,13 @@ class GCPWorkerManager:
             elif action == 'delete':
                 if instance_names:
                     for instance_name in instance_names:
-                        operation = self.compute_client.delete(
+                        operation = await asyncio.to_thread(
+                            self.compute_client.delete,
                             project=self.project_id,
                             zone=self.zone,
                             instance=instance_name
                         )
-                        operation.result()
+                        await self._wait_op(operation)
                     message = f"Deleted instances: {instance_names}"
                 else:
                     message = "Instance names required for deletion"
@@ -655,11 +771,11 @@ class GCPWorkerManager:
             logger.error(f"Failed to manage worker instances: {e}")
             return {'success': False, 'error': str(e)}
     
-    async def get_gcp_infrastructure_status(self) -> Dict[str, Any]:
+    async def get_gcp_infrastructure_status(self, include_labels: bool = False) -> Dict[str, Any]:
         """Get GCP infrastructure status"""
         try:
             status = {
-                'compute_instances': await self._get_compute_status(),
+                'compute_instances': await self._get_compute_status(include_labels),
                 'instance_groups': await self._get_instance_groups_status(),
                 'storage_buckets': await self._get_storage_status(),
                 'cloud_functions': await self._get_functions_status(),
@@ -672,27 +788,36 @@ class GCPWorkerManager:
             logger.error(f"Failed to get GCP infrastructure status: {e}")
             return {'success': False, 'error': str(e)}
     
-    async def _get_compute_status(self) -> List[Dict]:
-        """Get Compute Engine instances status"""
+    async def _get_compute_status(self, include_labels: bool = False) -> List[Dict]:
+        """Get Compute Engine instances status (labels only when requested)"""
         try:
-            instances = self.compute_client.list(
-                project=self.project_id,
-                zone=self.zone
+            # Walking the paginated listing is blocking I/O
+            instances = await asyncio.to_thread(
+                lambda: list(self.compute_client.list(
+                    project=self.project_id,
+                    zone=self.zone,
+                    metadata=[('x-goog-fieldmask', INSTANCE_LIST_FIELDS)]
+                ))
             )
             
             instance_list = []
             for instance in instances:
                 # Filter for VT-Ultra-Pro instances
                 if 'vt-ultra-pro' in instance.labels.get('project', ''):
-                    instance_list.append({
+                    instance_info = {
                         'name': instance.name,
                         'status': instance.status,
                         'machine_type': instance.machine_type.split('/')[-1],
                         'internal_ip': instance.network_interfaces[0].network_i_p,
                         'external_ip': instance.network_interfaces[0].access_configs[0].nat_i_p if instance.network_interfaces[0].access_configs else None,
-                        'creation_timestamp': instance.creation_timestamp,
-                        'labels': dict(instance.labels)
-                    })
+                        'creation_timestamp': instance.creation_timestamp
+                    }
+                    
+                    # Copying the protobuf label map is per-row churn; skip unless asked
+                    if include_labels:
+                        instance_info['labels'] = dict(instance.labels)
+                    
+                    instance_list.append(instance_info)
             
             return instance_list
             
@@ -703,23 +828,26 @@ class GCPWorkerManager:
     async def _get_instance_groups_status(self) -> List[Dict]:
         """Get instance groups status"""
         try:
-            mig_client = compute_v1.InstanceGroupManagersClient()
-            groups = mig_client.list(
-                project=self.project_id,
-                zone=self.zone
+            # Filter for VT-Ultra-Pro groups server-side; the paginated listing
+            # is blocking I/O, and filter is only accepted on the request object
+            groups = await asyncio.to_thread(
+                lambda: list(self.mig_client.list(request={
+                    'project': self.project_id,
+                    'zone': self.zone,
+                    'filter': 'name eq .*vt-ultra-pro.*'
+                }))
             )
             
             group_list = []
             for group in groups:
-                # Filter for VT-Ultra-Pro groups
-                if 'vt-ultra-pro' in group.name:
-                    group_list.append({
-                        'name': group.name,
-                        'base_instance_name': group.base_instance_name,
-                        'target_size': group.target_size,
-                        'current_size': group.current_actions.none if hasattr(group, 'current_actions') else 0,
-                        'status': 'ACTIVE' if group.status.is_stable else 'UPDATING'
-                    })
+                current_actions = getattr(group, 'current_actions', None)
+                group_list.append({
+                    'name': group.name,
+                    'base_instance_name': group.base_instance_name,
+                    'target_size': group.target_size,
+                    'current_size': current_actions.none if current_actions else 0,
+                    'status': 'ACTIVE' if group.status.is_stable else 'UPDATING'
+                })
             
             return group_list
             
@@ -727,67 +855,166 @@ class GCPWorkerManager:
             logger.error(f"Failed to get instance groups status: {e}")
             return []
     
+    async def _cached_status(self, name: str, fetch, ttl: float = 30.0):
+        """Serve a status listing from memory for ttl seconds (successful fetches only)"""
+        key = (name, self.project_id, self.region)
+        now = time.monotonic()
+        cached = self._status_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        value = await fetch()
+        # A failed fetch (None) is not cached, so one API error is not served for ttl
+        if value is None:
+            return []
+        self._status_cache[key] = (now + ttl, value)
+        return value
+    
+    def _invalidate_status(self, name: str):
+        """Drop a cached status listing after a write"""
+        self._status_cache.pop((name, self.project_id, self.region), None)
+    
     async def _get_storage_status(self) -> List[Dict]:
-        """Get Cloud Storage status"""
+        """Get Cloud Storage status (cached briefly for dashboard polling)"""
+        return await self._cached_status('storage', self._fetch_storage_status)
+    
+    async def _fetch_storage_status(self) -> Optional[List[Dict]]:
+        """Fetch Cloud Storage status, or None on failure"""
         try:
-            buckets = list(self.storage_client.list_buckets())
+            # Only VT-Ultra-Pro buckets come back: filtered server-side by name prefix
+            matched = await asyncio.to_thread(
+                lambda: list(self.storage_client.list_buckets(prefix=BUCKET_PREFIX, max_results=1000))
+            )
+            
+            # One Monitoring query sizes every bucket; only buckets without a
+            # data point fall back to listing their objects concurrently
+            bucket_sizes = await self._get_bucket_sizes_from_monitoring()
+            unsized = [bucket for bucket in matched if bucket.name not in bucket_sizes]
+            listed_sizes = await asyncio.gather(
+                *(self._get_bucket_size(bucket) for bucket in unsized),
+                return_exceptions=True
+            )
+            for bucket, size in zip(unsized, listed_sizes):
+                bucket_sizes[bucket.name] = 0 if isinstance(size, Exception) else size
             
             bucket_list = []
-            for bucket in buckets:
-                # Check labels or name for VT-Ultra-Pro
-                if 'vt-ultra-pro' in bucket.name.lower():
-                    try:
-                        size = sum(blob.size for blob in bucket.list_blobs())
-                    except:
-                        size = 0
-                    
-                    bucket_list.append({
-                        'name': bucket.name,
-                        'location': bucket.location,
-                        'storage_class': bucket.storage_class,
-                        'size_bytes': size,
-                        'size_human': self._bytes_to_human(size),
-                        'created': bucket.time_created.isoformat()
-                    })
+            for bucket in matched:
+                size = bucket_sizes[bucket.name]
+                
+                bucket_list.append({
+                    'name': bucket.name,
+                    'location': bucket.location,
+                    'storage_class': bucket.storage_class,
+                    'size_bytes': size,
+                    'size_human': self._bytes_to_human(size),
+                    'created': bucket.time_created.isoformat()
+                })
             
             return bucket_list
             
         except Exception as e:
             logger.error(f"Failed to get storage status: {e}")
-            return []
+            return None
     
-    async def _get_functions_status(self) -> List[Dict]:
-        """Get Cloud Functions status"""
+    async def _get_bucket_sizes_from_monitoring(self) -> Dict[str, int]:
+        """Get VT-Ultra-Pro bucket sizes from the daily storage/total_bytes metric"""
         try:
-            from google.cloud import functions_v1
-            functions_client = functions_v1.CloudFunctionsServiceClient()
+            now = datetime.utcnow()
+            interval = monitoring_v3.TimeInterval({
+                'end_time': now,
+                'start_time': now - timedelta(hours=24)
+            })
             
-            functions = functions_client.list_functions(
-                parent=f'projects/{self.project_id}/locations/{self.region}'
+            results = await self._get_monitoring_client().list_time_series(
+                name=f'projects/{self.project_id}',
+                filter=(
+                    'metric.type="storage.googleapis.com/storage/total_bytes" '
+                    'AND resource.type="gcs_bucket" '
+                    f'AND resource.label.bucket_name=monitoring.regex.full_match("{BUCKET_PREFIX}.*")'
+                ),
+                interval=interval,
+                view=monitoring_v3.ListTimeSeriesRequest.TimeSeriesView.FULL
             )
             
-            function_list = []
-            for function in functions:
-                if 'vt-ultra-pro' in function.name.lower():
-                    function_list.append({
-                        'name': function.name.split('/')[-1],
-                        'status': function.status.name,
-                        'runtime': function.runtime,
-                        'entry_point': function.entry_point,
-                        'trigger': 'HTTP' if function.https_trigger else 'Other',
-                        'update_time': function.update_time.isoformat()
-                    })
+            # One series per storage class; points are newest first
+            sizes = {}
+            async for series in results:
+                if not series.points:
+                    continue
+                bucket_name = series.resource.labels['bucket_name']
+                latest = series.points[0].value
+                sizes[bucket_name] = sizes.get(bucket_name, 0) + int(
+                    latest.double_value or latest.int64_value
+                )
+            
+            return sizes
+            
+        except Exception as e:
+            logger.warning(f"Failed to get bucket sizes from monitoring: {e}")
+            return {}
+    
+    def _get_monitoring_client(self) -> monitoring_v3.MetricServiceAsyncClient:
+        """Get the async monitoring client, creating it from inside a coroutine"""
+        # Created lazily: the aio client binds its channel to the running loop
+        if self.monitoring_client is None:
+            self.monitoring_client = monitoring_v3.MetricServiceAsyncClient()
+        return self.monitoring_client
+    
+    async def _get_bucket_size(self, bucket) -> int:
+        """Sum object sizes of a bucket with the aiohttp-based storage client"""
+        # Created lazily: the aio client binds its session to the running loop
+        if self.aio_storage is None:
+            self.aio_storage = AsyncStorage()
+        
+        total = 0
+        params = {'fields': 'items(size),nextPageToken'}
+        while True:
+            page = await self.aio_storage.list_objects(bucket.name, params=params)
+            total += sum(int(item['size']) for item in page.get('items', []))
+            
+            if not page.get('nextPageToken'):
+                return total
+            params['pageToken'] = page['nextPageToken']
+    
+    async def _get_functions_status(self) -> List[Dict]:
+        """Get Cloud Functions status (cached briefly for dashboard polling)"""
+        return await self._cached_status('functions', self._fetch_functions_status)
+    
+    async def _fetch_functions_status(self) -> Optional[List[Dict]]:
+        """Fetch Cloud Functions status, or None on failure"""
+        try:
+            # Walking the paginated listing is blocking I/O
+            functions = await asyncio.to_thread(
+                lambda: list(self.functions_client.list_functions(
+                    parent=f'projects/{self.project_id}/locations/{self.region}'
+                ))
+            )
             
-            return function_list
+            return [
+                {
+                    'name': function.name.split('/')[-1],
+                    'status': function.status.name,
+                    'runtime': function.runtime,
+                    'entry_point': function.entry_point,
+                    'trigger': 'HTTP' if function.https_trigger else 'Other',
+                    'update_time': function.update_time.isoformat()
+                }
+                for function in functions
+                if 'vt-ultra-pro' in function.name.lower()
+            ]
             
         except Exception as e:
             logger.error(f"Failed to get functions status: {e}")
-            return []
+            return None
     
-    def _bytes_to_human(self, bytes_size: float) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _bytes_to_human(bytes_size: int) -> str:
         """Convert bytes to human readable format"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_size < 1024.0:
-                return f"{bytes_size:.2f} {unit}"
-            bytes_size /= 1024.0
-        return f"{bytes_size:.2f} PB"
\ No newline at end of file
+        bytes_size = int(bytes_size)
+        if bytes_size < 1024:
+            return f"{bytes_size:.2f} B"
+        
+        # Each unit is 2**10 larger, so the bit length picks the unit directly
+        unit_index = min((bytes_size.bit_length() - 1) // 10, len(BYTE_UNITS) - 1)
+        return f"{bytes_size / (1 << (unit_index * 10)):.2f} {BYTE_UNITS[unit_index]}"
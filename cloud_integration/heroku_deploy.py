@@ -3,38 +3,99 @@ Heroku Deployment Automation for VT ULTRA PRO
 """
 
 import logging
+import asyncio
 import os
-import json
-import subprocess
+import re
 import tempfile
+import time
+from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
+from types import MappingProxyType
+import aiofiles
+import aiohttp
+import docker
 import heroku3
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+HEROKU_API_URL = 'https://api.heroku.com'
+HEROKU_POSTGRES_API_URL = 'https://postgres-api.heroku.com'
+HEROKU_REGISTRY = 'registry.heroku.com'
+SENSITIVE_KEY_PATTERN = re.compile(r'key|secret|password|token', re.IGNORECASE)
+
 class HerokuDeployManager:
     """Heroku deployment and management automation"""
     
+    __slots__ = ('api_key', 'heroku_conn', '_requests_session', '_http_session', '_app_cache')
+    
+    # Heroku dyno pricing per hour (approx)
+    DYNO_PRICING = MappingProxyType({
+        'eco': 0.005,
+        'basic': 0.007,
+        'standard-1x': 0.025,
+        'standard-2x': 0.050,
+        'performance-m': 0.250,
+        'performance-l': 0.500
+    })
+    
     def __init__(self, api_key: str = None):
         self.api_key = api_key or os.getenv('HEROKU_API_KEY')
         self.heroku_conn = None
+        self._requests_session: Optional[requests.Session] = None
+        self._http_session: Optional[aiohttp.ClientSession] = None
+        self._app_cache: Dict[str, tuple] = {}
         self._initialize_connection()
         
         logger.info("Heroku Deploy Manager initialized")
     
+    async def __aenter__(self):
+        self._get_http_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+    
     def _initialize_connection(self):
         """Initialize Heroku connection"""
         try:
             if self.api_key:
-                self.heroku_conn = heroku3.from_key(self.api_key)
+                # Keep-alive pool so heroku3 calls reuse TCP/TLS connections
+                self._requests_session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=16,
+                    pool_maxsize=32,
+                    max_retries=Retry(total=2, backoff_factor=0.1)
+                )
+                self._requests_session.mount('https://', adapter)
+                
+                self.heroku_conn = heroku3.from_key(self.api_key, session=self._requests_session)
                 logger.info("Heroku connection established")
             else:
                 logger.warning("Heroku API key not provided")
         except Exception as e:
             logger.error(f"Failed to initialize Heroku connection: {e}")
     
+    def _get_app(self, app_name: str, ttl: float = 60.0):
+        """Resolve an app by name, cached for ttl seconds"""
+        now = time.monotonic()
+        cached = self._app_cache.get(app_name)
+        if cached and cached[1] > now:
+            return cached[0]
+        
+        # GET /apps/{name} instead of listing every app on the account
+        if hasattr(self.heroku_conn, 'app'):
+            app = self.heroku_conn.app(app_name)
+        else:
+            app = self.heroku_conn.apps()[app_name]
+        
+        self._app_cache[app_name] = (app, now + ttl)
+        return app
+    
     async def create_app(self, app_name: str, region: str = 'us',
                         stack: str = 'container') -> Dict[str, Any]:
         """Create a new Heroku app"""
@@ -42,14 +103,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            # Check if app name is available
-            try:
-                requests.get(f'https://{app_name}.herokuapp.com')
-                return {'success': False, 'error': 'App name already taken'}
-            except:
-                pass
-            
-            # Create the app
+            # Create the app (Heroku rejects taken names itself, no probe needed)
             app = self.heroku_conn.create_app(
                 name=app_name,
                 region=region,
@@ -80,7 +134,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Set up GitHub integration
             integration = app.create_github_integration(
@@ -125,37 +179,23 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Check if app has container stack
             if app.stack.name != 'container':
                 app.update_buildstack('container')
             
-            # Build and push Docker image
-            # Note: This requires Heroku CLI and Docker to be installed locally
-            process = subprocess.run([
-                'heroku', 'container:push', 'web',
-                '--app', app_name,
-                '--context-path', context_path
-            ], capture_output=True, text=True)
-            
-            if process.returncode != 0:
-                return {
-                    'success': False,
-                    'error': f'Docker build failed: {process.stderr}'
-                }
-            
-            # Release the container
-            process = subprocess.run([
-                'heroku', 'container:release', 'web',
-                '--app', app_name
-            ], capture_output=True, text=True)
+            # Build and push straight to the Heroku registry via the Docker SDK
+            image_id = await asyncio.to_thread(
+                self._build_and_push_image, app_name, dockerfile_path, context_path
+            )
             
-            if process.returncode != 0:
-                return {
-                    'success': False,
-                    'error': f'Container release failed: {process.stderr}'
-                }
+            # Release the container by pointing the web formation at the image
+            await self._heroku_api_request(
+                'PATCH', f'/apps/{app_name}/formation',
+                json={'updates': [{'type': 'web', 'docker_image': image_id}]},
+                accept='application/vnd.heroku+json; version=3.docker-releases'
+            )
             
             logger.info(f"Deployed Docker container to {app_name}")
             
@@ -171,6 +211,52 @@ class HerokuDeployManager:
             logger.error(f"Failed to deploy with Docker: {e}")
             return {'success': False, 'error': str(e)}
     
+    def _build_and_push_image(self, app_name: str, dockerfile_path: str,
+                              context_path: str) -> str:
+        """Build the web image and push it to the Heroku registry, returning its ID"""
+        client = docker.from_env()
+        tag = f'{HEROKU_REGISTRY}/{app_name}/web'
+        
+        client.login(username='_', password=self.api_key, registry=HEROKU_REGISTRY)
+        image, _ = client.images.build(path=context_path, dockerfile=dockerfile_path, tag=tag)
+        
+        for line in client.images.push(tag, stream=True, decode=True):
+            if 'error' in line:
+                raise RuntimeError(f"Docker push failed: {line['error']}")
+        
+        return image.id
+    
+    async def _heroku_api_request(self, method: str, path: str,
+                                  accept: str = 'application/vnd.heroku+json; version=3',
+                                  headers: Dict[str, str] = None,
+                                  base_url: str = HEROKU_API_URL,
+                                  **kwargs) -> Any:
+        """Call the Heroku Platform API directly"""
+        headers = {'Accept': accept, **(headers or {})}
+        
+        async with self._get_http_session().request(
+            method, f'{base_url}{path}', headers=headers, **kwargs
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Shared keep-alive session for direct Platform API calls"""
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http_session
+    
+    async def close(self):
+        """Close pooled HTTP connections"""
+        if self._http_session and not self._http_session.closed:
+            await self._http_session.close()
+        if self._requests_session is not None:
+            self._requests_session.close()
+    
     async def configure_addons(self, app_name: str,
                              addons: List[Dict]) -> Dict[str, Any]:
         """Configure Heroku addons"""
@@ -178,33 +264,13 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
-            installed_addons = []
+            app = self._get_app(app_name)
             
-            for addon_config in addons:
-                addon_name = addon_config.get('name')
-                plan = addon_config.get('plan', 'hobby-dev')
-                
-                try:
-                    # Install addon
-                    addon = app.install_addon(
-                        addon_name,
-                        plan=plan,
-                        config=addon_config.get('config', {})
-                    )
-                    
-                    installed_addons.append({
-                        'name': addon.name,
-                        'plan': plan,
-                        'state': addon.state,
-                        'config': addon.config
-                    })
-                    
-                    logger.info(f"Installed addon: {addon_name} ({plan})")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to install addon {addon_name}: {e}")
-                    continue
+            # Provision all addons concurrently; failures are isolated per addon
+            results = await asyncio.gather(
+                *(self._install_addon(app, addon_config) for addon_config in addons)
+            )
+            installed_addons = [result for result in results if result is not None]
             
             return {
                 'success': True,
@@ -216,6 +282,32 @@ class HerokuDeployManager:
             logger.error(f"Failed to configure addons: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def _install_addon(self, app, addon_config: Dict) -> Optional[Dict]:
+        """Install a single addon, returning None on failure"""
+        addon_name = addon_config.get('name')
+        plan = addon_config.get('plan', 'hobby-dev')
+        
+        try:
+            addon = await asyncio.to_thread(
+                app.install_addon,
+                addon_name,
+                plan=plan,
+                config=addon_config.get('config', {})
+            )
+            
+            logger.info(f"Installed addon: {addon_name} ({plan})")
+            
+            return {
+                'name': addon.name,
+                'plan': plan,
+                'state': addon.state,
+                'config': addon.config
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to install addon {addon_name}: {e}")
+            return None
+    
     async def setup_database(self, app_name: str,
                            database_type: str = 'postgresql',
                            plan: str = 'hobby-dev') -> Dict[str, Any]:
@@ -224,7 +316,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Install database addon
             if database_type.lower() == 'postgresql':
@@ -250,9 +342,8 @@ class HerokuDeployManager:
                 plan=plan
             )
             
-            # Wait for database to be ready
-            import time
-            time.sleep(10)
+            # Wait for database to be ready without blocking the event loop
+            database = await self._wait_for_addon(app, database)
             
             logger.info(f"Setup {database_type} database for {app_name}")
             
@@ -268,6 +359,23 @@ class HerokuDeployManager:
             logger.error(f"Failed to setup database: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def _wait_for_addon(self, app, addon, timeout: float = 120.0):
+        """Poll addon state with backoff until provisioned or timeout"""
+        deadline = time.monotonic() + timeout
+        delay = 1.0
+        
+        while addon.state != 'provisioned' and time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, 8.0)
+            
+            addons = await asyncio.to_thread(app.addons)
+            addon = next((a for a in addons if a.id == addon.id), addon)
+        
+        if addon.state != 'provisioned':
+            logger.warning(f"Addon {addon.name} not provisioned after {timeout}s (state: {addon.state})")
+        
+        return addon
+    
     async def scale_dynos(self, app_name: str,
                          dyno_type: str = 'web',
                          size: str = 'standard-1x',
@@ -277,7 +385,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Get formation
             formation = app.process_formation()[dyno_type]
@@ -302,17 +410,7 @@ class HerokuDeployManager:
     
     def _calculate_dyno_cost(self, size: str, quantity: int) -> float:
         """Calculate estimated hourly cost"""
-        # Heroku dyno pricing (approx)
-        pricing = {
-            'eco': 0.005,
-            'basic': 0.007,
-            'standard-1x': 0.025,
-            'standard-2x': 0.050,
-            'performance-m': 0.250,
-            'performance-l': 0.500
-        }
-        
-        hourly_rate = pricing.get(size, 0.025)
+        hourly_rate = self.DYNO_PRICING.get(size, 0.025)
         return round(hourly_rate * quantity, 4)
     
     async def configure_environment(self, app_name: str,
@@ -322,15 +420,11 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
-            # Update config vars
+            # Update config vars in a single PATCH (item assignment PATCHes per key)
             config = app.config()
-            
-            for key, value in env_vars.items():
-                config[key] = value
-            
-            config.update()
+            config.update(env_vars)
             
             logger.info(f"Updated environment variables for {app_name}")
             
@@ -352,7 +446,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Create log drain
             log_drain = app.create_log_drain(log_drain_url)
@@ -376,7 +470,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Get app info
             app_info = {
@@ -389,9 +483,21 @@ class HerokuDeployManager:
                 'updated_at': app.updated_at.isoformat() if app.updated_at else None
             }
             
+            # Fetch dynos, addons, releases and config concurrently
+            app_dynos, app_addons, app_releases, app_config = await asyncio.gather(
+                asyncio.to_thread(app.dynos),
+                asyncio.to_thread(app.addons),
+                # Last 5 releases, paginated server-side via the Range header
+                self._heroku_api_request(
+                    'GET', f'/apps/{app_name}/releases',
+                    headers={'Range': 'version ..; max=5, order=desc'}
+                ),
+                asyncio.to_thread(app.config)
+            )
+            
             # Get dyno info
             dynos = []
-            for dyno in app.dynos():
+            for dyno in app_dynos:
                 dynos.append({
                     'type': dyno.type,
                     'size': dyno.size,
@@ -402,7 +508,7 @@ class HerokuDeployManager:
             
             # Get addons
             addons = []
-            for addon in app.addons():
+            for addon in app_addons:
                 addons.append({
                     'name': addon.name,
                     'plan': addon.plan.name,
@@ -412,21 +518,20 @@ class HerokuDeployManager:
             
             # Get releases
             releases = []
-            for release in app.releases()[:5]:  # Last 5 releases
+            for release in app_releases:
                 releases.append({
-                    'version': release.version,
-                    'description': release.description,
-                    'created_at': release.created_at.isoformat(),
-                    'status': 'success' if release.status == 'succeeded' else 'failed'
+                    'version': release['version'],
+                    'description': release['description'],
+                    'created_at': release['created_at'],
+                    'status': 'success' if release['status'] == 'succeeded' else 'failed'
                 })
             
             # Get config vars (sensitive ones masked)
-            config_vars = {}
-            for key in app.config().keys():
-                if not any(sensitive in key.lower() for sensitive in ['key', 'secret', 'password', 'token']):
-                    config_vars[key] = '***MASKED***'
-                else:
-                    config_vars[key] = '***SENSITIVE***'
+            config_keys = list(app_config.keys())
+            config_vars = {
+                key: '***SENSITIVE***' if SENSITIVE_KEY_PATTERN.search(key) else '***MASKED***'
+                for key in config_keys
+            }
             
             return {
                 'success': True,
@@ -434,7 +539,7 @@ class HerokuDeployManager:
                 'dynos': dynos,
                 'addons': addons,
                 'releases': releases[:5],
-                'config_vars_count': len(app.config()),
+                'config_vars_count': len(config_keys),
                 'safe_config_vars': config_vars
             }
             
@@ -451,17 +556,27 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
-            
             # Build log options
-            options = {'lines': lines}
+            options = {'lines': lines, 'tail': False}
             if dyno:
                 options['dyno'] = dyno
             if source:
                 options['source'] = source
             
-            # Get logs
-            logs = app.get_log(**options)
+            # Open a log session, then stream it without blocking the event loop
+            log_session = await self._heroku_api_request(
+                'POST', f'/apps/{app_name}/log-sessions', json=options
+            )
+            
+            # The logplex URL carries its own token; don't send the API key there
+            chunks = []
+            async with aiohttp.ClientSession() as session:
+                async with session.get(log_session['logplex_url']) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        chunks.append(chunk)
+            
+            logs = b''.join(chunks).decode('utf-8', errors='replace')
             
             return {
                 'success': True,
@@ -481,7 +596,7 @@ class HerokuDeployManager:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            app = self.heroku_conn.apps()[app_name]
+            app = self._get_app(app_name)
             
             # Restart all dynos
             app.restart()
@@ -500,36 +615,51 @@ class HerokuDeployManager:
             return {'success': False, 'error': str(e)}
     
     async def backup_database(self, app_name: str,
-                            database_id: str = 'DATABASE_URL') -> Dict[str, Any]:
+                            database_id: str = 'DATABASE_URL',
+                            timeout: float = 600.0) -> Dict[str, Any]:
         """Backup Heroku database"""
         try:
             if not self.heroku_conn:
                 return {'success': False, 'error': 'Heroku connection not available'}
             
-            # Using Heroku CLI for database backup
-            process = subprocess.run([
-                'heroku', 'pg:backups:capture',
-                '--app', app_name
-            ], capture_output=True, text=True)
+            # Capture through the Heroku Postgres API instead of forking the CLI
+            transfers_path = f'/client/v11/apps/{app_name}/transfers'
+            transfer = await self._heroku_api_request(
+                'POST', transfers_path,
+                base_url=HEROKU_POSTGRES_API_URL,
+                json={'from_name': database_id, 'to_name': 'BACKUP', 'to_type': 'gof3r'}
+            )
             
-            if process.returncode != 0:
+            # Poll the transfer with backoff until it finishes or timeout
+            deadline = time.monotonic() + timeout
+            delay = 1.0
+            while not transfer.get('finished_at'):
+                if time.monotonic() >= deadline:
+                    return {
+                        'success': False,
+                        'error': f"Database backup not finished after {timeout}s",
+                        'backup_id': transfer['uuid']
+                    }
+                await asyncio.sleep(delay)
+                delay = min(delay * 1.5, 10.0)
+                transfer = await self._heroku_api_request(
+                    'GET', f"{transfers_path}/{transfer['uuid']}",
+                    base_url=HEROKU_POSTGRES_API_URL
+                )
+            
+            if not transfer.get('succeeded'):
                 return {
                     'success': False,
-                    'error': f'Database backup failed: {process.stderr}'
+                    'error': f"Database backup failed: {transfer.get('logs') or transfer}"
                 }
             
-            # Get backup info
-            process = subprocess.run([
-                'heroku', 'pg:backups:info',
-                '--app', app_name
-            ], capture_output=True, text=True)
-            
             logger.info(f"Created database backup for {app_name}")
             
             return {
                 'success': True,
                 'app_name': app_name,
-                'backup_output': process.stdout,
+                'backup_id': transfer['uuid'],
+                'backup_size': transfer.get('processed_bytes'),
                 'timestamp': datetime.now().isoformat()
             }
             
@@ -589,8 +719,8 @@ class HerokuDeployManager:
             config_path = f'deploy/{app_name}/app.json'
             os.makedirs(os.path.dirname(config_path), exist_ok=True)
             
-            with open(config_path, 'w') as f:
-                json.dump(deploy_config, f, indent=2)
+            async with aiofiles.open(config_path, 'wb') as f:
+                await f.write(orjson.dumps(deploy_config, option=orjson.OPT_INDENT_2))
             
             # Create deploy button URL
             deploy_button_url = (
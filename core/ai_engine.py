@@ -4,19 +4,153 @@ Central AI Engine for VT ULTRA PRO
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import copy
+import functools
+import io
 import json
+import math
+import orjson
 from datetime import datetime
 import pickle
+import random
 import os
+import time
+import zipfile
+
+VIEW_METHODS = np.array(['browser', 'api', 'cloud', 'hybrid'])
+
+TIMEZONE_OFFSETS = {
+    'US': -5, 'UK': 0, 'CA': -5, 'AU': 10,
+    'DE': 1, 'FR': 1, 'JP': 9, 'BR': -3, 'IN': 5.5
+}
+
+COUNTRY_TIMEZONES = {
+    'US': 'America/New_York',
+    'UK': 'Europe/London',
+    'CA': 'America/Toronto',
+    'AU': 'Australia/Sydney',
+    'DE': 'Europe/Berlin',
+    'FR': 'Europe/Paris',
+    'JP': 'Asia/Tokyo',
+    'BR': 'America/Sao_Paulo',
+    'IN': 'Asia/Kolkata'
+}
+
+# AutoOptimizer recommendations: (parameter, 'lt' | 'gt', threshold, message)
+RECOMMENDATION_RULES = [
+    ('watch_time', 'lt', 15, "Increase minimum watch time to at least 15 seconds"),
+    ('views_per_hour', 'gt', 50, "Reduce views per hour for more organic appearance"),
+    ('geo_diversity', 'lt', 0.3, "Increase geographic diversity"),
+    ('interaction_rate', 'lt', 0.05, "Add some interactions (likes/comments)")
+]
+
+COUNTRY_CITIES = {
+    'US': ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix'],
+    'UK': ['London', 'Manchester', 'Birmingham', 'Liverpool'],
+    'CA': ['Toronto', 'Vancouver', 'Montreal', 'Calgary'],
+    'AU': ['Sydney', 'Melbourne', 'Brisbane', 'Perth'],
+    'DE': ['Berlin', 'Munich', 'Hamburg', 'Frankfurt'],
+    'FR': ['Paris', 'Marseille', 'Lyon', 'Toulouse'],
+    'JP': ['Tokyo', 'Osaka', 'Kyoto', 'Yokohama'],
+    'BR': ['Sao Paulo', 'Rio de Janeiro', 'Brasilia'],
+    'IN': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai']
+}
+
+# Prediction buckets: searchsorted counts thresholds strictly below the
+# probability, so each bucket is (lower, upper]
+PROBABILITY_THRESHOLDS = np.array([0.6, 0.7, 0.8, 0.9])
+RECOMMENDED_METHODS = np.array(['browser', 'hybrid', 'cloud', 'api', 'browser'])
+DELIVERY_HOURS = np.array([12, 8, 4, 2, 1])
+RISK_LEVELS = np.array(['very_high', 'high', 'medium', 'low', 'very_low'])
+
+# Confidence is high below 0.1 / above 0.9, medium below 0.2 / above 0.8;
+# the lower bounds are exclusive, hence nextafter
+CONFIDENCE_THRESHOLDS = np.array([np.nextafter(0.1, 0), np.nextafter(0.2, 0), 0.8, 0.9])
+CONFIDENCE_LABELS = np.array(['high', 'medium', 'low', 'medium', 'high'])
+
+def _deep_update(base: Dict, override: Dict) -> Dict:
+    """Recursively merge override into base, keeping nested defaults"""
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_update(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str) -> Dict:
+    """Load AI configuration merged over the defaults, once per path"""
+    default_config = {
+        'model_settings': {
+            'view_predictor': {
+                'input_size': 20,
+                'hidden_size': 64,
+                'output_size': 1,
+                'learning_rate': 0.001,
+                'epochs': 100,
+                'quantize': False
+            },
+            'pattern_generator': {
+                'latent_size': 32,
+                'hidden_size': 128,
+                'sequence_length': 24,
+                'learning_rate': 0.0005
+            }
+        },
+        'training': {
+            'batch_size': 32,
+            'validation_split': 0.2,
+            'early_stopping_patience': 10
+        },
+        'inference': {
+            'confidence_threshold': 0.7,
+            'max_predictions': 1000
+        }
+    }
+    
+    try:
+        with open(config_path, 'rb') as f:
+            user_config = orjson.loads(f.read())
+            # Merge with default
+            _deep_update(default_config, user_config)
+    except:
+        pass
+    
+    return default_config
+
+class _CompiledWithFallback:
+    """Call a torch.compile'd module, switching to the eager module if compilation fails"""
+    def __init__(self, compiled: nn.Module, eager: nn.Module):
+        self._module = compiled
+        self._eager = eager
+    
+    def __call__(self, *args, **kwargs):
+        # torch.compile builds lazily, so backend errors (no Triton, unsupported ops)
+        # only surface here, on the first call or a later recompile
+        try:
+            return self._module(*args, **kwargs)
+        except Exception as e:
+            if self._module is self._eager:
+                raise
+            print(f"torch.compile failed, falling back to eager mode: {e}")
+            self._module = self._eager
+            return self._eager(*args, **kwargs)
 
 class AIEngine:
     def __init__(self, config_path: str = 'config/ai_config.json'):
         self.config = self._load_config(config_path)
         self.models = {}
+        self._compiled_models = {}
+        self._pred_buf = None
+        # Per-second time features
+        self._time_cache_sec = -1
+        self._time_feats = np.zeros(4)
+        self.rng = np.random.default_rng()
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
         # Initialize sub-modules
@@ -30,48 +164,14 @@ class AIEngine:
     
     def _load_config(self, config_path: str) -> Dict:
         """Load AI configuration"""
-        default_config = {
-            'model_settings': {
-                'view_predictor': {
-                    'input_size': 20,
-                    'hidden_size': 64,
-                    'output_size': 1,
-                    'learning_rate': 0.001,
-                    'epochs': 100
-                },
-                'pattern_generator': {
-                    'latent_size': 32,
-                    'hidden_size': 128,
-                    'sequence_length': 24,
-                    'learning_rate': 0.0005
-                }
-            },
-            'training': {
-                'batch_size': 32,
-                'validation_split': 0.2,
-                'early_stopping_patience': 10
-            },
-            'inference': {
-                'confidence_threshold': 0.7,
-                'max_predictions': 1000
-            }
-        }
-        
-        try:
-            with open(config_path, 'r') as f:
-                user_config = json.load(f)
-                # Merge with default
-                default_config.update(user_config)
-        except:
-            pass
-        
-        return default_config
+        # Cached per path; each engine gets its own copy to mutate
+        return copy.deepcopy(_load_config_cached(config_path))
     
     class ViewSuccessDataset(Dataset):
         """Dataset for view success prediction"""
         def __init__(self, features, labels):
-            self.features = torch.FloatTensor(features)
-            self.labels = torch.FloatTensor(labels)
+            self.features = torch.as_tensor(features, dtype=torch.float32).contiguous()
+            self.labels = torch.as_tensor(labels, dtype=torch.float32).contiguous()
         
         def __len__(self):
             return len(self.features)
@@ -116,27 +216,38 @@ class AIEngine:
             train_dataset = self.ViewSuccessDataset(X_train, y_train)
             val_dataset = self.ViewSuccessDataset(X_val, y_val)
             
-            train_loader = DataLoader(
-                train_dataset, 
-                batch_size=self.config['training']['batch_size'],
-                shuffle=True
-            )
-            val_loader = DataLoader(
-                val_dataset,
-                batch_size=self.config['training']['batch_size']
-            )
+            # Datasets fit in device memory: upload once and slice batches from
+            # there instead of re-copying every batch through a DataLoader
+            X_train_t = train_dataset.features.to(self.device)
+            y_train_t = train_dataset.labels.to(self.device)
+            X_val_t = val_dataset.features.to(self.device)
+            y_val_t = val_dataset.labels.to(self.device)
+            
+            # Full batches only, so the compiled graph sees fixed shapes
+            batch_size = self.config['training']['batch_size']
+            n_train = len(train_dataset)
+            last_start = n_train - batch_size + 1 if n_train > batch_size else n_train
+            train_batch_starts = range(0, last_start, batch_size)
+            val_batch_starts = range(0, len(val_dataset), batch_size)
             
             # Initialize model
             input_size = features.shape[1]
             model = self.ViewSuccessPredictor(input_size).to(self.device)
+            # Compiled wrapper for the hot loop; state dicts stay on the plain module
+            compiled_model = self._compile_model(model)
             criterion = nn.MSELoss()
             optimizer = optim.Adam(
                 model.parameters(), 
                 lr=self.config['model_settings']['view_predictor']['learning_rate']
             )
             
+            # Mixed precision on GPU; both are no-ops on CPU
+            use_amp = self.device.type == 'cuda'
+            scaler = torch.cuda.amp.GradScaler(enabled=use_amp)
+            
             # Training loop
             best_loss = float('inf')
+            best_state = None
             patience_counter = 0
             train_losses = []
             val_losses = []
@@ -144,34 +255,40 @@ class AIEngine:
             for epoch in range(self.config['model_settings']['view_predictor']['epochs']):
                 # Training
                 model.train()
-                train_loss = 0
-                for batch_features, batch_labels in train_loader:
-                    batch_features = batch_features.to(self.device)
-                    batch_labels = batch_labels.to(self.device)
+                # Losses accumulate on the device; synced once per epoch
+                train_loss = torch.zeros((), device=self.device)
+                permutation = torch.randperm(n_train, device=self.device)
+                for start in train_batch_starts:
+                    batch_index = permutation[start:start + batch_size]
+                    batch_features = X_train_t[batch_index]
+                    batch_labels = y_train_t[batch_index]
                     
                     optimizer.zero_grad()
-                    outputs = model(batch_features)
-                    loss = criterion(outputs.squeeze(), batch_labels)
-                    loss.backward()
-                    optimizer.step()
+                    with torch.cuda.amp.autocast(enabled=use_amp):
+                        outputs = compiled_model(batch_features)
+                        loss = criterion(outputs.squeeze(), batch_labels)
+                    scaler.scale(loss).backward()
+                    scaler.step(optimizer)
+                    scaler.update()
                     
-                    train_loss += loss.item()
+                    train_loss += loss.detach()
                 
                 # Validation
                 model.eval()
-                val_loss = 0
+                val_loss = torch.zeros((), device=self.device)
                 with torch.no_grad():
-                    for batch_features, batch_labels in val_loader:
-                        batch_features = batch_features.to(self.device)
-                        batch_labels = batch_labels.to(self.device)
+                    for start in val_batch_starts:
+                        batch_features = X_val_t[start:start + batch_size]
+                        batch_labels = y_val_t[start:start + batch_size]
                         
-                        outputs = model(batch_features)
-                        loss = criterion(outputs.squeeze(), batch_labels)
-                        val_loss += loss.item()
+                        with torch.cuda.amp.autocast(enabled=use_amp):
+                            outputs = compiled_model(batch_features)
+                            loss = criterion(outputs.squeeze(), batch_labels)
+                        val_loss += loss.detach()
                 
                 # Calculate averages
-                train_loss_avg = train_loss / len(train_loader)
-                val_loss_avg = val_loss / len(val_loader)
+                train_loss_avg = (train_loss / len(train_batch_starts)).item()
+                val_loss_avg = (val_loss / len(val_batch_starts)).item()
                 
                 train_losses.append(train_loss_avg)
                 val_losses.append(val_loss_avg)
@@ -180,8 +297,8 @@ class AIEngine:
                 if val_loss_avg < best_loss:
                     best_loss = val_loss_avg
                     patience_counter = 0
-                    # Save best model
-                    torch.save(model.state_dict(), 'models/best_view_predictor.pth')
+                    # Keep best weights in memory; persisted once after training
+                    best_state = {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
                 else:
                     patience_counter += 1
                 
@@ -193,8 +310,18 @@ class AIEngine:
                     print(f"Epoch {epoch+1}: Train Loss: {train_loss_avg:.4f}, Val Loss: {val_loss_avg:.4f}")
             
             # Load best model
-            model.load_state_dict(torch.load('models/best_view_predictor.pth'))
-            self.models['view_predictor'] = model
+            if best_state is not None:
+                model.load_state_dict(best_state)
+            # Registered models are kept in eval mode; inference never toggles it
+            self.models['view_predictor'] = model.eval()
+            if self.device.type == 'cpu':
+                # Ship a traced copy for low-latency CPU serving
+                traced_model = self._trace_model(model)
+                torch.jit.save(traced_model, 'models/view_predictor.pt')
+                self._compiled_models['view_predictor'] = traced_model
+            else:
+                # Rebuilt lazily from the best weights in the inference dtype
+                self._compiled_models.pop('view_predictor', None)
             
             return {
                 'status': 'success',
@@ -210,52 +337,96 @@ class AIEngine:
                 'message': str(e)
             }
     
+    def _compile_model(self, model: nn.Module) -> Callable[..., torch.Tensor]:
+        """Compile a model with torch.compile when available, falling back to eager on failure"""
+        if not hasattr(torch, 'compile'):
+            return model
+        return _CompiledWithFallback(
+            torch.compile(model, mode="reduce-overhead", fullgraph=True), model
+        )
+    
+    def _trace_model(self, model: nn.Module) -> torch.jit.ScriptModule:
+        """Trace a model into a frozen TorchScript module for CPU inference"""
+        input_size = model.model[0].in_features
+        example = torch.zeros(1, input_size, device=self.device)
+        with torch.no_grad():
+            traced = torch.jit.trace(model.eval(), example)
+        return torch.jit.optimize_for_inference(traced)
+    
+    def _get_inference_model(self, model_name: str) -> Callable[..., torch.Tensor]:
+        """Get the inference variant of a loaded model, building it once"""
+        if model_name not in self._compiled_models:
+            model = self.models[model_name]
+            if self.device.type == 'cpu':
+                self._compiled_models[model_name] = self._trace_model(model)
+            else:
+                if self._inference_dtype() == torch.bfloat16:
+                    # Cast a copy; the registered model stays FP32 for training and saving
+                    model = copy.deepcopy(model).to(dtype=torch.bfloat16)
+                self._compiled_models[model_name] = self._compile_model(model)
+        return self._compiled_models[model_name]
+    
+    def _inference_dtype(self) -> torch.dtype:
+        """Get the dtype inference models run in on this device"""
+        if self.device.type == 'cuda' and torch.cuda.is_bf16_supported():
+            return torch.bfloat16
+        return torch.float32
+    
+    def _get_prediction_buffer(self, input_size: int) -> torch.Tensor:
+        """Get the reusable (1, input_size) input tensor for single predictions"""
+        if self._pred_buf is None or self._pred_buf.shape[1] != input_size:
+            self._pred_buf = torch.empty(1, input_size, dtype=self._inference_dtype(), device=self.device)
+        return self._pred_buf
+    
     def _extract_features(self, data: pd.DataFrame) -> np.ndarray:
-        """Extract features from data"""
-        features = []
-        
-        for _, row in data.iterrows():
-            feature_vector = []
-            
-            # Time features
-            if 'timestamp' in row:
-                dt = pd.to_datetime(row['timestamp'])
-                feature_vector.extend([
-                    dt.hour / 24.0,
-                    dt.day / 31.0,
-                    dt.month / 12.0,
-                    dt.dayofweek / 7.0
-                ])
-            
-            # Video features
-            feature_vector.extend([
-                row.get('video_length', 60) / 300.0,  # Normalized to 5 minutes
-                row.get('video_age_hours', 24) / 720.0,  # Normalized to 30 days
-                row.get('creator_followers', 1000) / 1000000.0  # Normalized to 1M
+        """Extract features from data (column-wise, no per-row Python loop)"""
+        n = len(data)
+        
+        def column(name, default):
+            if name in data.columns:
+                return data[name].fillna(default).to_numpy(dtype=np.float64)
+            return np.full(n, default, dtype=np.float64)
+        
+        feature_columns = []
+        
+        # Time features
+        if 'timestamp' in data.columns:
+            ts = pd.to_datetime(data['timestamp']).dt
+            feature_columns.extend([
+                ts.hour.to_numpy() / 24.0,
+                ts.day.to_numpy() / 31.0,
+                ts.month.to_numpy() / 12.0,
+                ts.dayofweek.to_numpy() / 7.0
             ])
-            
-            # Method features (one-hot encoded)
-            methods = ['browser', 'api', 'cloud', 'hybrid']
-            method = row.get('method', 'browser')
-            for m in methods:
-                feature_vector.append(1.0 if m == method else 0.0)
-            
-            # Previous performance
-            feature_vector.append(row.get('previous_success_rate', 0.8))
-            feature_vector.append(row.get('previous_views', 1000) / 10000.0)
-            
-            # Geographic diversity
-            feature_vector.append(row.get('geo_diversity', 0.5))
-            
-            # Device mix
-            feature_vector.append(row.get('device_mix', 0.7))
-            
-            # Add noise for robustness
-            feature_vector.append(np.random.normal(0, 0.01))
-            
-            features.append(feature_vector)
         
-        return np.array(features)
+        # Video features
+        feature_columns.extend([
+            column('video_length', 60) / 300.0,  # Normalized to 5 minutes
+            column('video_age_hours', 24) / 720.0,  # Normalized to 30 days
+            column('creator_followers', 1000) / 1000000.0  # Normalized to 1M
+        ])
+        
+        # Method features (one-hot encoded)
+        if 'method' in data.columns:
+            method = data['method'].fillna('browser').to_numpy()
+        else:
+            method = np.full(n, 'browser', dtype=object)
+        feature_columns.append((method[:, None] == VIEW_METHODS).astype(np.float64))
+        
+        # Previous performance
+        feature_columns.append(column('previous_success_rate', 0.8))
+        feature_columns.append(column('previous_views', 1000) / 10000.0)
+        
+        # Geographic diversity
+        feature_columns.append(column('geo_diversity', 0.5))
+        
+        # Device mix
+        feature_columns.append(column('device_mix', 0.7))
+        
+        # Add noise for robustness
+        feature_columns.append(np.random.normal(0, 0.01, size=n))
+        
+        return np.column_stack(feature_columns)
     
     def predict_view_success(self, video_data: Dict) -> Dict:
         """Predict view success probability"""
@@ -267,123 +438,170 @@ class AIEngine:
                     'model_loaded': False
                 }
             
-            model = self.models['view_predictor']
-            model.eval()
+            model = self._get_inference_model('view_predictor')
             
             # Prepare features
             features = self._extract_single_features(video_data)
-            features_tensor = torch.FloatTensor(features).unsqueeze(0).to(self.device)
+            features_tensor = self._get_prediction_buffer(len(features))
+            features_tensor[0].copy_(torch.as_tensor(features, dtype=torch.float32))
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 prediction = model(features_tensor).item()
             
-            # Calculate confidence
-            confidence = self._calculate_confidence(prediction)
-            
-            # Recommend method
-            recommended_method = self._recommend_method(prediction, video_data)
+            return self._build_prediction(prediction, video_data)
             
+        except Exception as e:
             return {
+                'success_probability': 0.85,
+                'confidence': 'low',
+                'error': str(e)
+            }
+    
+    def predict_view_success_batch(self, video_datas: List[Dict]) -> List[Dict]:
+        """Predict view success probability for many videos in one forward pass"""
+        if not video_datas:
+            return []
+        
+        try:
+            if 'view_predictor' not in self.models:
+                return [{
+                    'success_probability': 0.85,  # Default
+                    'confidence': 'medium',
+                    'model_loaded': False
+                } for _ in video_datas]
+            
+            model = self._get_inference_model('view_predictor')
+            
+            # Prepare features as one (N, F) block
+            features = self._extract_single_features_batch(video_datas)
+            features_tensor = torch.from_numpy(features.astype(np.float32)).to(
+                self.device, dtype=self._inference_dtype(), non_blocking=True
+            )
+            
+            with torch.inference_mode():
+                predictions = model(features_tensor).squeeze(1).float().cpu().tolist()
+            
+            # Post-process every probability in one lookup per field
+            confidences = self._bucket(CONFIDENCE_THRESHOLDS, CONFIDENCE_LABELS, predictions)
+            methods = self._bucket(PROBABILITY_THRESHOLDS, RECOMMENDED_METHODS, predictions)
+            delivery_times = self._bucket(PROBABILITY_THRESHOLDS, DELIVERY_HOURS, predictions)
+            risk_levels = self._bucket(PROBABILITY_THRESHOLDS, RISK_LEVELS, predictions)
+            
+            return [{
                 'success_probability': prediction,
                 'confidence': confidence,
-                'recommended_method': recommended_method,
-                'estimated_delivery_time': self._estimate_delivery_time(prediction),
-                'risk_level': self._assess_risk(prediction)
-            }
+                'recommended_method': method,
+                'estimated_delivery_time': delivery_time,
+                'risk_level': risk_level
+            } for prediction, confidence, method, delivery_time, risk_level
+                in zip(predictions, confidences, methods, delivery_times, risk_levels)]
             
         except Exception as e:
-            return {
+            return [{
                 'success_probability': 0.85,
                 'confidence': 'low',
                 'error': str(e)
-            }
+            } for _ in video_datas]
     
-    def _extract_single_features(self, video_data: Dict) -> List[float]:
+    def _build_prediction(self, prediction: float, video_data: Dict) -> Dict:
+        """Build the prediction result for one probability"""
+        return {
+            'success_probability': prediction,
+            'confidence': self._calculate_confidence(prediction),
+            'recommended_method': self._recommend_method(prediction, video_data),
+            'estimated_delivery_time': self._estimate_delivery_time(prediction),
+            'risk_level': self._assess_risk(prediction)
+        }
+    
+    def _extract_single_features(self, video_data: Dict) -> np.ndarray:
         """Extract features for single prediction"""
-        features = []
+        n_methods = len(VIEW_METHODS)
+        # A fresh row per call: callers may keep it or interleave calls
+        features = np.empty(12 + n_methods, dtype=np.float32)
         
         # Time features (current time)
-        dt = datetime.now()
-        features.extend([
-            dt.hour / 24.0,
-            dt.day / 31.0,
-            dt.month / 12.0,
-            dt.weekday() / 7.0
-        ])
+        features[0:4] = self._time_features()
         
         # Video features
-        features.extend([
-            video_data.get('length', 60) / 300.0,
-            video_data.get('age_hours', 24) / 720.0,
-            video_data.get('creator_followers', 1000) / 1000000.0
-        ])
+        features[4] = video_data.get('length', 60) / 300.0
+        features[5] = video_data.get('age_hours', 24) / 720.0
+        features[6] = video_data.get('creator_followers', 1000) / 1000000.0
         
         # Method features (default to browser)
-        methods = ['browser', 'api', 'cloud', 'hybrid']
-        method = video_data.get('preferred_method', 'browser')
-        for m in methods:
-            features.append(1.0 if m == method else 0.0)
+        features[7:7 + n_methods] = VIEW_METHODS == video_data.get('preferred_method', 'browser')
         
         # Historical data
-        features.extend([
-            video_data.get('historical_success_rate', 0.8),
-            video_data.get('historical_views', 1000) / 10000.0,
-            video_data.get('geo_diversity', 0.5),
-            video_data.get('device_mix', 0.7)
-        ])
+        features[7 + n_methods] = video_data.get('historical_success_rate', 0.8)
+        features[8 + n_methods] = video_data.get('historical_views', 1000) / 10000.0
+        features[9 + n_methods] = video_data.get('geo_diversity', 0.5)
+        features[10 + n_methods] = video_data.get('device_mix', 0.7)
         
-        # Random noise
-        features.append(np.random.normal(0, 0.01))
+        # Noise column is only used in training; constant at inference
+        features[11 + n_methods] = 0.0
         
         return features
     
+    def _time_features(self) -> np.ndarray:
+        """Get current-time features, recomputed at most once per second"""
+        now = time.time()
+        second = int(now)
+        if second != self._time_cache_sec:
+            dt = datetime.fromtimestamp(now)
+            self._time_feats[:] = [dt.hour / 24.0, dt.day / 31.0, dt.month / 12.0, dt.weekday() / 7.0]
+            self._time_cache_sec = second
+        return self._time_feats
+    
+    def _extract_single_features_batch(self, video_datas: List[Dict]) -> np.ndarray:
+        """Extract prediction features for many videos as an (N, F) array"""
+        n = len(video_datas)
+        
+        def column(key, default):
+            return np.fromiter((video_data.get(key, default) for video_data in video_datas),
+                               dtype=np.float64, count=n)
+        
+        # Time features (current time, shared by every row)
+        time_features = np.tile(self._time_features(), (n, 1))
+        
+        # Method features (default to browser)
+        methods = np.array([video_data.get('preferred_method', 'browser') for video_data in video_datas],
+                           dtype=object)
+        
+        return np.column_stack([
+            time_features,
+            # Video features
+            column('length', 60) / 300.0,
+            column('age_hours', 24) / 720.0,
+            column('creator_followers', 1000) / 1000000.0,
+            (methods[:, None] == VIEW_METHODS).astype(np.float64),
+            # Historical data
+            column('historical_success_rate', 0.8),
+            column('historical_views', 1000) / 10000.0,
+            column('geo_diversity', 0.5),
+            column('device_mix', 0.7),
+            # Noise column is only used in training; constant at inference
+            np.zeros(n)
+        ])
+    
+    @staticmethod
+    def _bucket(thresholds: np.ndarray, labels: np.ndarray, probability):
+        """Look up threshold-bucket labels: one label for a float, a list for a list of floats"""
+        return labels[np.searchsorted(thresholds, probability)].tolist()
+    
     def _calculate_confidence(self, probability: float) -> str:
         """Calculate prediction confidence"""
-        if probability > 0.9 or probability < 0.1:
-            return 'high'
-        elif probability > 0.8 or probability < 0.2:
-            return 'medium'
-        else:
-            return 'low'
+        return self._bucket(CONFIDENCE_THRESHOLDS, CONFIDENCE_LABELS, probability)
     
     def _recommend_method(self, probability: float, video_data: Dict) -> str:
         """Recommend best method based on prediction"""
-        if probability > 0.9:
-            return 'browser'  # Most reliable
-        elif probability > 0.8:
-            return 'api'  # Fast and reliable
-        elif probability > 0.7:
-            return 'cloud'  # Good balance
-        elif probability > 0.6:
-            return 'hybrid'  # Mixed approach
-        else:
-            return 'browser'  # Safest option
+        return self._bucket(PROBABILITY_THRESHOLDS, RECOMMENDED_METHODS, probability)
     
     def _estimate_delivery_time(self, probability: float) -> int:
         """Estimate delivery time in hours"""
-        if probability > 0.9:
-            return 1  # 1 hour
-        elif probability > 0.8:
-            return 2  # 2 hours
-        elif probability > 0.7:
-            return 4  # 4 hours
-        elif probability > 0.6:
-            return 8  # 8 hours
-        else:
-            return 12  # 12 hours
+        return self._bucket(PROBABILITY_THRESHOLDS, DELIVERY_HOURS, probability)
     
     def _assess_risk(self, probability: float) -> str:
         """Assess risk level"""
-        if probability > 0.9:
-            return 'very_low'
-        elif probability > 0.8:
-            return 'low'
-        elif probability > 0.7:
-            return 'medium'
-        elif probability > 0.6:
-            return 'high'
-        else:
-            return 'very_high'
+        return self._bucket(PROBABILITY_THRESHOLDS, RISK_LEVELS, probability)
     
     class PatternGenerator(nn.Module):
         """GAN for generating organic view patterns"""
@@ -422,8 +640,11 @@ class AIEngine:
                 duration_hours
             )
             
+            # Work column-wise on one frame; dicts only at the API boundary
+            pattern = pd.DataFrame(base_pattern)
+            
             # Add randomness
-            pattern = self._add_organic_noise(base_pattern)
+            pattern = self._add_organic_noise(pattern)
             
             # Ensure total views
             pattern = self._normalize_pattern(pattern, views_count)
@@ -437,31 +658,38 @@ class AIEngine:
             # Add timezone adjustments
             pattern = self._adjust_for_timezones(pattern)
             
-            return pattern
+            return self._pattern_to_records(pattern)
             
         except Exception as e:
             # Fallback to basic pattern
             return self._generate_basic_pattern(views_count, duration_hours)
     
-    def _add_organic_noise(self, pattern: List[Dict]) -> List[Dict]:
+    def _add_organic_noise(self, pattern: pd.DataFrame) -> pd.DataFrame:
         """Add organic noise to pattern"""
-        for entry in pattern:
-            # Random watch time variation
-            if 'watch_time' in entry:
-                entry['watch_time'] *= np.random.uniform(0.8, 1.2)
-                entry['watch_time'] = max(5, min(180, entry['watch_time']))
-            
-            # Random interaction probability
-            if random.random() < 0.3:
-                entry['interaction'] = random.choice(['like', 'comment_view', 'share'])
-            
-            # Random device switch
-            if random.random() < 0.1:
-                entry['device'] = random.choice(['mobile', 'desktop', 'tablet'])
+        n = len(pattern)
+        
+        # Every random stream is drawn once, up front, from the shared generator
+        watch_factor = self.rng.uniform(0.8, 1.2, size=n)
+        interaction_roll = self.rng.random(n)
+        interaction_draw = self.rng.choice(['like', 'comment_view', 'share'], size=n)
+        device_roll = self.rng.random(n)
+        device_draw = self.rng.choice(['mobile', 'desktop', 'tablet'], size=n)
+        
+        # Random watch time variation
+        if 'watch_time' in pattern.columns:
+            pattern['watch_time'] = (pattern['watch_time'] * watch_factor).clip(5, 180)
+        
+        # Random interaction probability
+        interacts = interaction_roll < 0.3
+        pattern.loc[interacts, 'interaction'] = interaction_draw[interacts]
+        
+        # Random device switch
+        switches = device_roll < 0.1
+        pattern.loc[switches, 'device'] = device_draw[switches]
         
         return pattern
     
-    def _normalize_pattern(self, pattern: List[Dict], target_views: int) -> List[Dict]:
+    def _normalize_pattern(self, pattern: pd.DataFrame, target_views: int) -> pd.DataFrame:
         """Normalize pattern to target views"""
         current_views = len(pattern)
         
@@ -469,7 +697,7 @@ class AIEngine:
             # Add more views
             views_to_add = target_views - current_views
             new_entries = self._generate_additional_entries(views_to_add, pattern)
-            pattern.extend(new_entries)
+            pattern = pd.concat([pattern, new_entries], ignore_index=True)
         
         elif current_views > target_views:
             # Remove excess views (randomly)
@@ -478,55 +706,40 @@ class AIEngine:
                 current_views - target_views, 
                 replace=False
             )
-            pattern = [entry for i, entry in enumerate(pattern) 
-                      if i not in indices_to_remove]
+            keep = np.ones(len(pattern), dtype=bool)
+            keep[indices_to_remove] = False
+            pattern = pattern[keep].reset_index(drop=True)
         
         return pattern
     
-    def _add_geographic_distribution(self, pattern: List[Dict]) -> List[Dict]:
+    def _add_geographic_distribution(self, pattern: pd.DataFrame) -> pd.DataFrame:
         """Add geographic distribution to pattern"""
         countries = ['US', 'UK', 'CA', 'AU', 'DE', 'FR', 'JP', 'BR', 'IN']
         weights = [0.35, 0.15, 0.10, 0.08, 0.07, 0.06, 0.05, 0.05, 0.09]
         
-        for entry in pattern:
-            country = np.random.choice(countries, p=weights)
-            entry['country'] = country
-            entry['city'] = self._get_random_city(country)
-            entry['timezone'] = self._get_timezone(country)
+        # One batched draw for every entry instead of one RNG call per entry
+        pattern['country'] = np.random.choice(countries, size=len(pattern), p=weights)
+        
+        # Cities are drawn in one batch per country group
+        country = pattern['country'].to_numpy()
+        city = np.empty(len(pattern), dtype=object)
+        for name in np.unique(country):
+            in_country = country == name
+            city[in_country] = np.random.choice(COUNTRY_CITIES.get(name, ['Unknown']), size=int(in_country.sum()))
+        pattern['city'] = city
+        pattern['timezone'] = pattern['country'].map(COUNTRY_TIMEZONES).fillna('UTC')
         
         return pattern
     
     def _get_random_city(self, country: str) -> str:
         """Get random city for country"""
-        cities = {
-            'US': ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix'],
-            'UK': ['London', 'Manchester', 'Birmingham', 'Liverpool'],
-            'CA': ['Toronto', 'Vancouver', 'Montreal', 'Calgary'],
-            'AU': ['Sydney', 'Melbourne', 'Brisbane', 'Perth'],
-            'DE': ['Berlin', 'Munich', 'Hamburg', 'Frankfurt'],
-            'FR': ['Paris', 'Marseille', 'Lyon', 'Toulouse'],
-            'JP': ['Tokyo', 'Osaka', 'Kyoto', 'Yokohama'],
-            'BR': ['Sao Paulo', 'Rio de Janeiro', 'Brasilia'],
-            'IN': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai']
-        }
-        return random.choice(cities.get(country, ['Unknown']))
+        return random.choice(COUNTRY_CITIES.get(country, ['Unknown']))
     
     def _get_timezone(self, country: str) -> str:
         """Get timezone for country"""
-        timezones = {
-            'US': 'America/New_York',
-            'UK': 'Europe/London',
-            'CA': 'America/Toronto',
-            'AU': 'Australia/Sydney',
-            'DE': 'Europe/Berlin',
-            'FR': 'Europe/Paris',
-            'JP': 'Asia/Tokyo',
-            'BR': 'America/Sao_Paulo',
-            'IN': 'Asia/Kolkata'
-        }
-        return timezones.get(country, 'UTC')
+        return COUNTRY_TIMEZONES.get(country, 'UTC')
     
-    def _add_device_mix(self, pattern: List[Dict]) -> List[Dict]:
+    def _add_device_mix(self, pattern: pd.DataFrame) -> pd.DataFrame:
         """Add device mix to pattern"""
         device_distribution = {
             'mobile': 0.75,
@@ -537,100 +750,96 @@ class AIEngine:
         devices = list(device_distribution.keys())
         probs = list(device_distribution.values())
         
-        for entry in pattern:
-            device = np.random.choice(devices, p=probs)
-            entry['device'] = device
-            
-            if device == 'mobile':
-                brands = ['iPhone', 'Samsung', 'Google', 'Xiaomi']
-                entry['device_brand'] = random.choice(brands)
-                entry['os'] = 'iOS' if entry['device_brand'] == 'iPhone' else 'Android'
-            elif device == 'desktop':
-                entry['os'] = random.choice(['Windows', 'macOS', 'Linux'])
-                entry['browser'] = random.choice(['Chrome', 'Firefox', 'Safari'])
-            else:  # tablet
-                entry['device_brand'] = random.choice(['iPad', 'Samsung Tablet'])
-                entry['os'] = 'iOS' if entry['device_brand'] == 'iPad' else 'Android'
+        device = np.random.choice(devices, size=len(pattern), p=probs)
+        pattern['device'] = device
+        
+        # Per-device attributes are drawn in one batch per device group
+        brand = np.full(len(pattern), None, dtype=object)
+        os_name = np.full(len(pattern), None, dtype=object)
+        browser = np.full(len(pattern), None, dtype=object)
+        
+        mobile = device == 'mobile'
+        brand[mobile] = np.random.choice(['iPhone', 'Samsung', 'Google', 'Xiaomi'], size=int(mobile.sum()))
+        os_name[mobile] = np.where(brand[mobile] == 'iPhone', 'iOS', 'Android')
+        
+        desktop = device == 'desktop'
+        os_name[desktop] = np.random.choice(['Windows', 'macOS', 'Linux'], size=int(desktop.sum()))
+        browser[desktop] = np.random.choice(['Chrome', 'Firefox', 'Safari'], size=int(desktop.sum()))
+        
+        tablet = device == 'tablet'
+        brand[tablet] = np.random.choice(['iPad', 'Samsung Tablet'], size=int(tablet.sum()))
+        os_name[tablet] = np.where(brand[tablet] == 'iPad', 'iOS', 'Android')
+        
+        pattern['device_brand'] = brand
+        pattern['os'] = os_name
+        pattern['browser'] = browser
         
         return pattern
     
-    def _adjust_for_timezones(self, pattern: List[Dict]) -> List[Dict]:
+    def _adjust_for_timezones(self, pattern: pd.DataFrame) -> pd.DataFrame:
         """Adjust pattern for different timezones"""
-        for entry in pattern:
-            if 'country' in entry and 'timezone' in entry:
-                # Adjust hour based on timezone
-                hour = entry.get('hour', 12)
-                country = entry['country']
-                
-                # Simple timezone offset (in reality, use pytz)
-                offsets = {
-                    'US': -5, 'UK': 0, 'CA': -5, 'AU': 10,
-                    'DE': 1, 'FR': 1, 'JP': 9, 'BR': -3, 'IN': 5.5
-                }
-                
-                offset = offsets.get(country, 0)
-                adjusted_hour = (hour + offset) % 24
-                entry['local_hour'] = adjusted_hour
+        if 'country' not in pattern.columns or 'timezone' not in pattern.columns:
+            return pattern
+        
+        # Adjust hour based on timezone (simple offsets; in reality, use pytz)
+        hour = pattern['hour'].fillna(12) if 'hour' in pattern.columns else 12
+        offset = pattern['country'].map(TIMEZONE_OFFSETS).fillna(0)
+        has_zone = pattern['country'].notna() & pattern['timezone'].notna()
+        pattern['local_hour'] = ((hour + offset) % 24).where(has_zone)
         
         return pattern
     
+    def _pattern_to_records(self, pattern: pd.DataFrame) -> List[Dict]:
+        """Convert a pattern frame to entry dicts, omitting unset fields"""
+        return [
+            {key: value for key, value in record.items() if not pd.isna(value)}
+            for record in pattern.to_dict(orient='records')
+        ]
+    
     def _generate_basic_pattern(self, views_count: int, 
                                duration_hours: int) -> List[Dict]:
         """Generate basic pattern as fallback"""
-        pattern = []
         views_per_hour = max(1, views_count // duration_hours)
         
-        for hour in range(duration_hours):
-            hour_views = views_per_hour + random.randint(-2, 2)
-            hour_views = max(0, hour_views)
-            
-            for _ in range(hour_views):
-                entry = {
-                    'hour': hour,
-                    'minute': random.randint(0, 59),
-                    'second': random.randint(0, 59),
-                    'watch_time': random.randint(15, 60),
-                    'device': random.choice(['mobile', 'desktop']),
-                    'country': random.choice(['US', 'UK', 'CA']),
-                    'interaction': random.choice(['none', 'like', 'view']) if random.random() < 0.3 else 'none'
-                }
-                pattern.append(entry)
+        # Per-hour counts drawn at once, then trimmed to the exact count
+        hour_views = np.maximum(0, views_per_hour + self.rng.integers(-2, 3, size=duration_hours))
+        hours = np.repeat(np.arange(duration_hours), hour_views)[:views_count]
+        n_regular = len(hours)
         
-        # Trim or extend to exact count
-        if len(pattern) > views_count:
-            pattern = pattern[:views_count]
-        else:
-            while len(pattern) < views_count:
-                hour = random.randint(0, duration_hours - 1)
-                entry = {
-                    'hour': hour,
-                    'minute': random.randint(0, 59),
-                    'second': random.randint(0, 59),
-                    'watch_time': random.randint(15, 60),
-                    'device': random.choice(['mobile', 'desktop']),
-                    'country': random.choice(['US', 'UK', 'CA']),
-                    'interaction': 'none'
-                }
-                pattern.append(entry)
+        # Extend with random hours if the hourly counts fell short
+        if n_regular < views_count:
+            extra_hours = self.rng.integers(0, duration_hours, size=views_count - n_regular)
+            hours = np.concatenate([hours, extra_hours])
         
-        return pattern
+        # Interactions only for regular entries, 30% of which roll one
+        interaction = np.full(views_count, 'none', dtype=object)
+        interacts = self.rng.random(n_regular) < 0.3
+        interaction[:n_regular][interacts] = self.rng.choice(['none', 'like', 'view'], size=int(interacts.sum()))
+        
+        pattern = pd.DataFrame({
+            'hour': hours,
+            'minute': self.rng.integers(0, 60, size=views_count),
+            'second': self.rng.integers(0, 60, size=views_count),
+            'watch_time': self.rng.integers(15, 61, size=views_count),
+            'device': self.rng.choice(['mobile', 'desktop'], size=views_count),
+            'country': self.rng.choice(['US', 'UK', 'CA'], size=views_count),
+            'interaction': interaction
+        })
+        
+        return self._pattern_to_records(pattern)
     
     def _generate_additional_entries(self, count: int, 
-                                   base_pattern: List[Dict]) -> List[Dict]:
+                                   base_pattern: pd.DataFrame) -> pd.DataFrame:
         """Generate additional pattern entries"""
-        new_entries = []
+        # Copy random entries from base pattern
+        new_entries = base_pattern.sample(n=count, replace=True).reset_index(drop=True)
         
-        for _ in range(count):
-            # Copy random entry from base pattern
-            base_entry = random.choice(base_pattern)
-            new_entry = base_entry.copy()
-            
-            # Add some variation
-            new_entry['hour'] = (new_entry.get('hour', 12) + random.randint(-2, 2)) % 24
-            new_entry['minute'] = random.randint(0, 59)
-            new_entry['watch_time'] = new_entry.get('watch_time', 30) * random.uniform(0.8, 1.2)
-            
-            new_entries.append(new_entry)
+        # Add some variation
+        hour = new_entries['hour'].fillna(12) if 'hour' in new_entries.columns else 12
+        new_entries['hour'] = (hour + np.random.randint(-2, 3, size=count)) % 24
+        new_entries['minute'] = np.random.randint(0, 60, size=count)
+        watch_time = new_entries['watch_time'].fillna(30) if 'watch_time' in new_entries.columns else 30
+        new_entries['watch_time'] = watch_time * np.random.uniform(0.8, 1.2, size=count)
         
         return new_entries
     
@@ -647,9 +856,10 @@ class AIEngine:
                   historical_patterns: List[List[Dict]]) -> List[Dict]:
             """Detect anomalies in pattern"""
             anomalies = []
+            frame = pd.DataFrame(pattern)
             
             # Check view spikes
-            spikes = self._detect_view_spikes(pattern)
+            spikes = self._detect_view_spikes(frame)
             anomalies.extend(spikes)
             
             # Check pattern deviation
@@ -657,36 +867,38 @@ class AIEngine:
             anomalies.extend(deviations)
             
             # Check geographic anomalies
-            geo_anomalies = self._detect_geo_anomalies(pattern)
+            geo_anomalies = self._detect_geo_anomalies(frame)
             anomalies.extend(geo_anomalies)
             
             return anomalies
         
-        def _detect_view_spikes(self, pattern: List[Dict]) -> List[Dict]:
+        def _detect_view_spikes(self, pattern: pd.DataFrame) -> List[Dict]:
             """Detect sudden spikes in views"""
             anomalies = []
             
-            # Group by hour
-            hourly_counts = {}
-            for entry in pattern:
-                hour = entry.get('hour', 0)
-                hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
+            # Count by hour
+            if 'hour' in pattern.columns:
+                hours = pattern['hour'].fillna(0).to_numpy(dtype=np.int64)
+            else:
+                hours = np.zeros(len(pattern), dtype=np.int64)
+            hourly_counts = np.bincount(hours, minlength=24)
+            active_hours = np.flatnonzero(hourly_counts)
+            counts = hourly_counts[active_hours]
             
-            # Calculate statistics
-            counts = list(hourly_counts.values())
+            # Calculate statistics over the hours that saw traffic
             if len(counts) > 1:
-                mean = np.mean(counts)
-                std = np.std(counts)
+                mean = counts.mean()
+                std = counts.std()
                 
-                for hour, count in hourly_counts.items():
-                    if count > mean + 3 * std:
-                        anomalies.append({
-                            'type': 'view_spike',
-                            'hour': hour,
-                            'count': count,
-                            'expected_max': int(mean + 2 * std),
-                            'severity': 'high'
-                        })
+                spikes = counts > mean + 3 * std
+                for hour, count in zip(active_hours[spikes].tolist(), counts[spikes].tolist()):
+                    anomalies.append({
+                        'type': 'view_spike',
+                        'hour': hour,
+                        'count': count,
+                        'expected_max': int(mean + 2 * std),
+                        'severity': 'high'
+                    })
             
             return anomalies
         
@@ -698,76 +910,71 @@ class AIEngine:
             if not historical_patterns:
                 return anomalies
             
-            # Calculate historical averages
-            hist_hourly = []
-            for hist_pattern in historical_patterns:
-                hourly_counts = {}
-                for entry in hist_pattern:
-                    hour = entry.get('hour', 0)
-                    hourly_counts[hour] = hourly_counts.get(hour, 0) + 1
-                hist_hourly.append(hourly_counts)
-            
-            # Compare with current pattern
-            current_hourly = {}
-            for entry in pattern:
-                hour = entry.get('hour', 0)
-                current_hourly[hour] = current_hourly.get(hour, 0) + 1
-            
-            for hour in set(list(current_hourly.keys()) + 
-                          [h for hist in hist_hourly for h in hist.keys()]):
-                current = current_hourly.get(hour, 0)
-                historical = [hist.get(hour, 0) for hist in hist_hourly]
-                
-                if historical:
-                    hist_mean = np.mean(historical)
-                    hist_std = np.std(historical)
-                    
-                    if hist_std > 0:
-                        z_score = (current - hist_mean) / hist_std
-                        
-                        if abs(z_score) > self.thresholds['pattern_deviation']:
-                            anomalies.append({
-                                'type': 'pattern_deviation',
-                                'hour': hour,
-                                'current': current,
-                                'historical_mean': hist_mean,
-                                'z_score': z_score,
-                                'severity': 'high' if abs(z_score) > 3 else 'medium'
-                            })
+            # Hourly counts as one (K, H) matrix for history and one row for now
+            def hours_of(entries):
+                return np.fromiter((entry.get('hour', 0) for entry in entries), dtype=np.int64, count=len(entries))
+            
+            current_hours = hours_of(pattern)
+            hist_hours = [hours_of(hist_pattern) for hist_pattern in historical_patterns]
+            n_hours = max([24] + [int(h.max()) + 1 for h in [current_hours, *hist_hours] if len(h)])
+            
+            current_hourly = np.bincount(current_hours, minlength=n_hours)
+            hist_matrix = np.stack([np.bincount(h, minlength=n_hours) for h in hist_hours])
+            
+            hist_mean = hist_matrix.mean(axis=0)
+            hist_std = hist_matrix.std(axis=0)
+            
+            # z-scores for every hour in one pass; hours with no spread are skipped
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z_scores = np.where(hist_std > 0, (current_hourly - hist_mean) / hist_std, 0.0)
+            flagged = np.flatnonzero(np.abs(z_scores) > self.thresholds['pattern_deviation'])
+            
+            for hour in flagged.tolist():
+                z_score = float(z_scores[hour])
+                anomalies.append({
+                    'type': 'pattern_deviation',
+                    'hour': hour,
+                    'current': int(current_hourly[hour]),
+                    'historical_mean': float(hist_mean[hour]),
+                    'z_score': z_score,
+                    'severity': 'high' if abs(z_score) > 3 else 'medium'
+                })
             
             return anomalies
         
-        def _detect_geo_anomalies(self, pattern: List[Dict]) -> List[Dict]:
+        def _detect_geo_anomalies(self, pattern: pd.DataFrame) -> List[Dict]:
             """Detect geographic anomalies"""
             anomalies = []
             
             # Count by country
-            country_counts = {}
-            for entry in pattern:
-                country = entry.get('country', 'Unknown')
-                country_counts[country] = country_counts.get(country, 0) + 1
+            if 'country' in pattern.columns:
+                countries = pattern['country'].fillna('Unknown')
+            else:
+                countries = pd.Series('Unknown', index=pattern.index)
+            country_counts = countries.value_counts(sort=False)
+            shares = country_counts / len(pattern)
             
-            total = len(pattern)
+            unusual = ['KP', 'SY', 'IR', 'CU', 'RU']  # High-risk countries
+            concentrated = shares > 0.8
+            is_unusual = shares.index.isin(unusual)
             
-            for country, count in country_counts.items():
-                percentage = count / total
-                
+            # Only countries that trip a check are visited
+            for country in shares.index[concentrated.to_numpy() | is_unusual]:
                 # Check for concentration
-                if percentage > 0.8:
+                if concentrated[country]:
                     anomalies.append({
                         'type': 'geo_concentration',
                         'country': country,
-                        'percentage': percentage * 100,
+                        'percentage': shares[country] * 100,
                         'severity': 'high'
                     })
                 
                 # Check for unusual countries
-                unusual = ['KP', 'SY', 'IR', 'CU', 'RU']  # High-risk countries
                 if country in unusual:
                     anomalies.append({
                         'type': 'unusual_country',
                         'country': country,
-                        'count': count,
+                        'count': int(country_counts[country]),
                         'severity': 'high'
                     })
             
@@ -776,7 +983,7 @@ class AIEngine:
     class AutoOptimizer:
         """Auto-optimization for view parameters"""
         def __init__(self):
-            self.parameters = {
+            parameters = {
                 'watch_time': {'min': 5, 'max': 180, 'current': 30},
                 'views_per_hour': {'min': 1, 'max': 100, 'current': 10},
                 'delay_between': {'min': 1.0, 'max': 10.0, 'current': 3.0},
@@ -784,74 +991,141 @@ class AIEngine:
                 'geo_diversity': {'min': 0.1, 'max': 1.0, 'current': 0.5}
             }
             
+            # Parameters are held as parallel arrays indexed by name
+            self._names = list(parameters)
+            self._name_idx = {name: i for i, name in enumerate(self._names)}
+            self._min = np.array([p['min'] for p in parameters.values()], dtype=np.float64)
+            self._max = np.array([p['max'] for p in parameters.values()], dtype=np.float64)
+            self._current = np.array([p['current'] for p in parameters.values()], dtype=np.float64)
+            
             self.history = []
         
+        @property
+        def parameters(self) -> Dict:
+            """Parameter ranges and current values by name"""
+            return {
+                name: {'min': lo, 'max': hi, 'current': current}
+                for name, lo, hi, current in zip(
+                    self._names, self._min.tolist(), self._max.tolist(), self._current.tolist()
+                )
+            }
+        
         def optimize(self, performance_data: List[Dict]) -> Dict:
             """Optimize parameters based on performance"""
             if not performance_data:
                 return self.parameters
             
-            # Calculate success rates
-            success_rates = []
-            for data in performance_data:
-                if data.get('views_sent', 0) > 0:
-                    rate = data.get('views_delivered', 0) / data.get('views_sent', 1)
-                    success_rates.append({
-                        'rate': rate,
-                        'parameters': data.get('parameters', {})
-                    })
+            # Calculate success rates; runs with nothing sent are not candidates
+            n = len(performance_data)
+            sent = np.fromiter((data.get('views_sent', 0) for data in performance_data), dtype=np.float64, count=n)
+            delivered = np.fromiter((data.get('views_delivered', 0) for data in performance_data),
+                                    dtype=np.float64, count=n)
+            valid = sent > 0
             
-            if not success_rates:
+            if not valid.any():
                 return self.parameters
             
+            rates = np.full(n, -np.inf)
+            np.divide(delivered, sent, out=rates, where=valid)
+            
             # Find best performing parameters
-            best = max(success_rates, key=lambda x: x['rate'])
+            best_index = int(rates.argmax())
+            best_rate = float(rates[best_index])
+            best_parameters = performance_data[best_index].get('parameters', {})
             
-            # Adjust parameters towards best performing
-            for param_name in self.parameters:
-                if param_name in best['parameters']:
-                    best_value = best['parameters'][param_name]
-                    current = self.parameters[param_name]['current']
-                    
-                    # Move 10% towards best value
-                    new_value = current + 0.1 * (best_value - current)
-                    
-                    # Clamp to valid range
-                    min_val = self.parameters[param_name]['min']
-                    max_val = self.parameters[param_name]['max']
-                    new_value = max(min_val, min(max_val, new_value))
-                    
-                    self.parameters[param_name]['current'] = new_value
+            best_values = np.full(len(self._names), np.nan)
+            for name, value in best_parameters.items():
+                if name in self._name_idx:
+                    best_values[self._name_idx[name]] = value
+            has_best = ~np.isnan(best_values)
+            
+            # Move 10% towards best values, clamped to valid range
+            self._current[has_best] += 0.1 * (best_values[has_best] - self._current[has_best])
+            np.clip(self._current, self._min, self._max, out=self._current)
             
             # Save to history
             self.history.append({
                 'timestamp': datetime.now().isoformat(),
-                'parameters': {k: v['current'] for k, v in self.parameters.items()},
-                'success_rate': best['rate']
+                'parameters': dict(zip(self._names, self._current.tolist())),
+                'success_rate': best_rate
             })
             
             return self.parameters
         
         def get_recommendations(self) -> List[str]:
             """Get optimization recommendations"""
-            recommendations = []
-            
-            if self.parameters['watch_time']['current'] < 15:
-                recommendations.append("Increase minimum watch time to at least 15 seconds")
-            
-            if self.parameters['views_per_hour']['current'] > 50:
-                recommendations.append("Reduce views per hour for more organic appearance")
+            values = self._current[[self._name_idx[name] for name, _, _, _ in RECOMMENDATION_RULES]]
+            thresholds = np.array([threshold for _, _, threshold, _ in RECOMMENDATION_RULES])
+            below = np.array([op == 'lt' for _, op, _, _ in RECOMMENDATION_RULES])
             
-            if self.parameters['geo_diversity']['current'] < 0.3:
-                recommendations.append("Increase geographic diversity")
-            
-            if self.parameters['interaction_rate']['current'] < 0.05:
-                recommendations.append("Add some interactions (likes/comments)")
-            
-            return recommendations
+            # Every rule is checked in one pass
+            violated = np.where(below, values < thresholds, values > thresholds)
+            return [message for (_, _, _, message), hit in zip(RECOMMENDATION_RULES, violated) if hit]
+    
+    class SuccessiveHalvingOptimizer:
+        """Successive-halving search over candidate view parameter sets"""
+        def __init__(self, configs: List[Dict], eta: int = 3,
+                     min_budget: int = 100, max_budget: Optional[int] = None):
+            # eta < 2 never shrinks a rung, so promotion would add rungs forever
+            if eta < 2:
+                raise ValueError(f"eta must be at least 2, got {eta}")
+            
+            self.configs = configs
+            self.eta = eta
+            self.max_budget = max_budget
+            
+            # Delivery counters per config, indexed by config id
+            self.sent = np.zeros(len(configs))
+            self.delivered = np.zeros(len(configs))
+            
+            # Each rung holds the config ids still competing at its views-sent budget
+            self.rungs = [list(range(len(configs)))]
+            self.budgets = [min_budget]
+        
+        def report(self, config_id: int, delivered: int, sent: int):
+            """Record delivery results for a config and promote finished rungs"""
+            self.sent[config_id] += sent
+            self.delivered[config_id] += delivered
+            self._promote()
+        
+        def _promote(self):
+            """Keep the top 1/eta of each fully evaluated rung at eta times the budget"""
+            while len(self.rungs[-1]) > 1:
+                arms = np.array(self.rungs[-1])
+                if (self.sent[arms] < self.budgets[-1]).any():
+                    return
+                
+                keep = math.ceil(len(arms) / self.eta)
+                ranked = arms[np.argsort(-self._rates(arms), kind='stable')]
+                budget = self.budgets[-1] * self.eta
+                if self.max_budget is not None:
+                    budget = min(budget, self.max_budget)
+                
+                self.rungs.append(ranked[:keep].tolist())
+                self.budgets.append(budget)
+        
+        def _rates(self, arms: np.ndarray) -> np.ndarray:
+            """Delivery rate per config; configs with nothing sent rate zero"""
+            sent = self.sent[arms]
+            return np.divide(self.delivered[arms], sent, out=np.zeros(len(arms)), where=sent > 0)
+        
+        def next_config(self) -> Optional[int]:
+            """Get the active config furthest from the current rung budget"""
+            arms = np.array(self.rungs[-1])
+            if len(arms) == 0:
+                return None
+            return int(arms[self.sent[arms].argmin()])
+        
+        def get_best(self) -> Optional[Dict]:
+            """Get the best config of the highest rung reached"""
+            arms = np.array(self.rungs[-1])
+            if len(arms) == 0:
+                return None
+            best = int(arms[self._rates(arms).argmax()])
+            return self.configs[best]
     
-    def save_model(self, model_name: str, path: str = None):
-        """Save AI model"""
+    async def save_model(self, model_name: str, path: str = None):
+        """Save AI model without blocking the event loop"""
         if model_name not in self.models:
             return False
         
@@ -859,7 +1133,10 @@ class AIEngine:
             path = f"models/{model_name}.pth"
         
         try:
-            torch.save(self.models[model_name].state_dict(), path)
+            # Serialize in memory, then write the file atomically, both off the loop
+            buffer = io.BytesIO()
+            await asyncio.to_thread(torch.save, self.models[model_name].state_dict(), buffer)
+            await asyncio.to_thread(self._atomic_write, path, buffer.getvalue())
             
             # Save metadata
             metadata = {
@@ -869,25 +1146,67 @@ class AIEngine:
                 'config': self.config['model_settings'].get(model_name, {})
             }
             
-            with open(f"models/{model_name}_metadata.json", 'w') as f:
-                json.dump(metadata, f, indent=2)
+            await asyncio.to_thread(
+                self._atomic_write,
+                f"models/{model_name}_metadata.json",
+                json.dumps(metadata, indent=2).encode()
+            )
             
             return True
         except Exception as e:
             print(f"Error saving model: {e}")
             return False
     
-    def load_model(self, model_name: str, path: str = None):
-        """Load AI model"""
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        """Write a file via a temporary sibling so readers never see a partial file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _load_blob(path: str) -> Optional[bytes]:
+        """Read a whole file, or None if it does not exist"""
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+    
+    @staticmethod
+    def _is_torchscript(path: str) -> bool:
+        """Check whether a model file is a TorchScript archive rather than a state dict"""
+        if not zipfile.is_zipfile(path):
+            return False
+        with zipfile.ZipFile(path) as archive:
+            return any(name.endswith('/constants.pkl') for name in archive.namelist())
+    
+    @staticmethod
+    def _quantize_model(model: nn.Module) -> torch.jit.ScriptModule:
+        """Script a dynamically int8-quantized copy of a float model"""
+        quantized = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        return torch.jit.script(quantized)
+    
+    async def load_model(self, model_name: str, path: str = None):
+        """Load AI model without blocking the event loop"""
+        # Dynamic int8 quantization is a CPU-only inference option
+        quantize = (self.device.type == 'cpu' and
+                    self.config['model_settings'].get(model_name, {}).get('quantize', False))
+        quantized_path = f"models/{model_name}_int8.pt"
+        weights_path = f"models/{model_name}.pth"
+        
         if path is None:
-            path = f"models/{model_name}.pth"
+            if quantize and await asyncio.to_thread(os.path.exists, quantized_path):
+                path = quantized_path
+            else:
+                path = weights_path
         
         try:
             # Load metadata
             metadata_path = f"models/{model_name}_metadata.json"
-            if os.path.exists(metadata_path):
-                with open(metadata_path, 'r') as f:
-                    metadata = json.load(f)
+            blob = await asyncio.to_thread(self._load_blob, metadata_path)
+            metadata = orjson.loads(blob) if blob else {}
             
             # Initialize model
             if model_name == 'view_predictor':
@@ -896,12 +1215,28 @@ class AIEngine:
             else:
                 return False
             
+            # TorchScript archives (prebuilt int8 or traced models) are inference copies only;
+            # the registered model always holds float weights so save_model output stays loadable
+            scripted = None
+            if await asyncio.to_thread(self._is_torchscript, path):
+                scripted = await asyncio.to_thread(torch.jit.load, path, map_location=self.device)
+                path = weights_path
+            
             # Load weights
-            model.load_state_dict(torch.load(path, map_location=self.device))
+            state_dict = await asyncio.to_thread(torch.load, path, map_location=self.device)
+            model.load_state_dict(state_dict)
             model.to(self.device)
             model.eval()
             
+            if scripted is None and quantize:
+                scripted = await asyncio.to_thread(self._quantize_model, model)
+                await asyncio.to_thread(torch.jit.save, scripted, quantized_path)
+            
             self.models[model_name] = model
+            if scripted is not None:
+                self._compiled_models[model_name] = scripted.eval()
+            else:
+                self._compiled_models.pop(model_name, None)
             return True
         except Exception as e:
             print(f"Error loading model: {e}")
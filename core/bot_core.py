@@ -6,11 +6,15 @@ import json
 import yaml
 import asyncio
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 import aiosqlite
+import orjson
 import redis.asyncio as redis
 
+# libyaml's C loader when available
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
 @dataclass
 class BotConfig:
     """Bot Configuration"""
@@ -46,8 +50,7 @@ class VTCore:
     async def load_config(self):
         """Load configuration from YAML"""
         try:
-            with open(self.config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
+            config_data = self._read_config_data()
             
             self.config = BotConfig(**config_data['bot'])
             
@@ -66,6 +69,29 @@ class VTCore:
             print(f"❌ Config load failed: {e}")
             raise
     
+    def _read_config_data(self) -> Dict:
+        """Parse config.yaml, reusing a JSON copy while the source is unchanged"""
+        # JSON rather than pickle: loading the cache must never execute code
+        cache_path = Path(f"{self.config_path}.cache.json")
+        try:
+            if cache_path.stat().st_mtime >= self.config_path.stat().st_mtime:
+                return orjson.loads(cache_path.read_bytes())
+        except Exception:
+            # Missing, truncated or invalid cache: re-parse the YAML
+            pass
+        
+        with open(self.config_path, 'r') as f:
+            config_data = yaml.load(f, Loader=YamlLoader)
+        
+        try:
+            blob = orjson.dumps(config_data)
+            # Only cache configs that survive JSON unchanged (no dates, non-str keys, NaN)
+            if orjson.loads(blob) == config_data:
+                cache_path.write_bytes(blob)
+        except (OSError, TypeError):
+            pass
+        return config_data
+    
     async def init_database(self):
         """Initialize databases"""
         try:
@@ -75,11 +101,8 @@ class VTCore:
             # Create tables
             await self.create_tables()
             
-            # Redis for caching
-            self.redis = redis.from_url(
-                self.config.redis_url,
-                decode_responses=True
-            )
+            # Redis for caching; values are raw bytes, encoded by the cache helpers
+            self.redis = redis.from_url(self.config.redis_url)
             
             print("✅ Databases initialized")
             return True
@@ -88,6 +111,32 @@ class VTCore:
             print(f"❌ Database init failed: {e}")
             raise
     
+    async def cache_get(self, key: str) -> Any:
+        """Get a cached value, or None if missing"""
+        raw = await self.redis.get(key)
+        return orjson.loads(raw) if raw is not None else None
+    
+    async def cache_get_many(self, keys: List[str]) -> List[Any]:
+        """Get several cached values in one round trip"""
+        raws = await self.redis.mget(keys)
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+    
+    async def cache_set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """Cache a JSON-serializable value, optionally expiring after ttl seconds"""
+        await self.redis.set(key, orjson.dumps(value), ex=ttl)
+    
+    async def cache_set_many(self, items: Dict[str, Any], ttl: Optional[int] = None):
+        """Cache several values in one pipelined round trip"""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(key, orjson.dumps(value), ex=ttl)
+            await pipe.execute()
+    
+    async def get_cached_str(self, key: str) -> Optional[str]:
+        """Get a plain string value, decoding only this key"""
+        raw = await self.redis.get(key)
+        return raw.decode() if raw is not None else None
+    
     async def create_tables(self):
         """Create database tables"""
         tables = [
@@ -169,9 +218,14 @@ class VTCore:
             """
         ]
         
-        for table_sql in tables:
-            await self.db.execute(table_sql)
+        indexes = [
+            "CREATE INDEX IF NOT EXISTS idx_orders_user ON orders (user_id)",
+            "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status)"
+        ]
         
+        # Whole schema in one script: one executor hop instead of one per statement
+        schema = ";\n".join(["PRAGMA journal_mode=WAL", *tables, *indexes]) + ";"
+        await self.db.executescript(schema)
         await self.db.commit()
         print("✅ Database tables created")
     
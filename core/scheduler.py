@@ -3,16 +3,49 @@ Advanced Task Scheduler for VT ULTRA PRO
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
 import json
-import uuid
+import secrets
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 import aiosqlite
 
 logger = logging.getLogger(__name__)
 
+# Queued writes are committed together, up to this many ops or this many seconds
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WINDOW = 0.2
+
+# Startup recovery: pending tasks overdue by more than the window are not reloaded
+RECOVERY_WINDOW = timedelta(days=1)
+RECOVERY_PAGE_SIZE = 10000
+
+# SQL is built once at import; the writer groups queued ops by these exact strings
+CREATE_TABLE_SQL = (
+    "CREATE TABLE IF NOT EXISTS scheduled_tasks ("
+    "id TEXT PRIMARY KEY, video_url TEXT, views INTEGER, schedule_time TEXT, "
+    "interval_minutes INTEGER, recurring INTEGER, status TEXT, priority INTEGER, "
+    "user_id TEXT, created_at TEXT, completed_at TEXT)"
+)
+CREATE_STATUS_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_sched_status_time ON scheduled_tasks (status, schedule_time)"
+)
+SELECT_PENDING_PAGE_SQL = (
+    "SELECT * FROM scheduled_tasks WHERE status = 'pending' AND (schedule_time, id) > (?, ?) "
+    "ORDER BY schedule_time, id LIMIT ?"
+)
+FAIL_INTERRUPTED_SQL = "UPDATE scheduled_tasks SET status = 'failed' WHERE status = 'running'"
+INSERT_TASK_SQL = (
+    "INSERT INTO scheduled_tasks (id, video_url, views, schedule_time, interval_minutes, "
+    "recurring, status, priority, user_id, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+UPDATE_STATUS_SQL = "UPDATE scheduled_tasks SET status = ? WHERE id = ?"
+UPDATE_COMPLETED_SQL = "UPDATE scheduled_tasks SET status = ?, completed_at = ? WHERE id = ?"
+
 @dataclass
 class ScheduledTask:
     id: str
@@ -26,63 +59,106 @@ class ScheduledTask:
     user_id: Optional[str] = None
     created_at: datetime = None
     completed_at: Optional[datetime] = None
+    config_id: Optional[int] = None
     
     def __post_init__(self):
         if self.created_at is None:
             self.created_at = datetime.now()
+        # Formatted once; written by the insert and never changed afterwards
+        self._schedule_iso = self.schedule_time.isoformat()
+    
+    def to_dict_fast(self) -> Dict:
+        """Flat dict of the task's fields, without asdict's recursive copy"""
+        return {key: value for key, value in self.__dict__.items() if not key.startswith('_')}
 
 class TaskScheduler:
-    def __init__(self, db_path: str = "database/scheduler.db"):
+    def __init__(self, db_path: str = "database/scheduler.db", max_workers: int = 32,
+                 optimizer=None):
         self.db_path = db_path
+        self.max_workers = max_workers
+        # Optional parameter search fed with each completed task's delivery stats
+        self.optimizer = optimizer
         self.tasks: Dict[str, ScheduledTask] = {}
+        # Task counts by status, kept in step with every status change
+        self._counts: Counter = Counter()
+        # Task ids per user, kept for finished tasks too so history stays listable
+        self._by_user: Dict[str, List[str]] = defaultdict(list)
         self.running = False
         self.scheduler_task = None
-        self.task_queue = asyncio.PriorityQueue()
+        # Due-time index: (schedule_time, -priority, task_id); stale entries are skipped on pop
+        self._heap: List[tuple] = []
+        self._wake = asyncio.Event()
+        # One long-lived connection fed by a coalescing writer
+        self._db = None
+        self._write_q: asyncio.Queue = asyncio.Queue()
+        self._writer = None
+        # Running executions, bounded by the worker semaphore
+        self._sem = None
+        self._inflight = set()
+        self._balancer = None
+        # Task ids: random per-process prefix plus a monotonic counter
+        self._id_prefix = secrets.token_urlsafe(4)
+        self._id_ctr = itertools.count()
         
     async def initialize(self):
         """Initialize scheduler database"""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute('''
-                CREATE TABLE IF NOT EXISTS scheduled_tasks (
-                    id TEXT PRIMARY KEY,
-                    video_url TEXT,
-                    views INTEGER,
-                    schedule_time TEXT,
-                    interval_minutes INTEGER,
-                    recurring INTEGER,
-                    status TEXT,
-                    priority INTEGER,
-                    user_id TEXT,
-                    created_at TEXT,
-                    completed_at TEXT
-                )
-            ''')
-            await db.commit()
-            
-            # Load existing tasks
-            async with db.execute('SELECT * FROM scheduled_tasks WHERE status IN (?, ?)', ('pending', 'running')) as cursor:
-                rows = await cursor.fetchall()
-                for row in rows:
-                    task = ScheduledTask(
-                        id=row[0],
-                        video_url=row[1],
-                        views=row[2],
-                        schedule_time=datetime.fromisoformat(row[3]),
-                        interval_minutes=row[4],
-                        recurring=bool(row[5]),
-                        status=row[6],
-                        priority=row[7],
-                        user_id=row[8],
-                        created_at=datetime.fromisoformat(row[9]),
-                        completed_at=datetime.fromisoformat(row[10]) if row[10] else None
+        self._db = db = await aiosqlite.connect(self.db_path)
+        
+        # WAL with NORMAL sync: one fsync per checkpoint instead of two per commit
+        await db.execute("PRAGMA journal_mode=WAL")
+        await db.execute("PRAGMA synchronous=NORMAL")
+        await db.execute("PRAGMA temp_store=MEMORY")
+        await db.execute("PRAGMA mmap_size=268435456")
+        
+        await db.execute(CREATE_TABLE_SQL)
+        await db.execute(CREATE_STATUS_INDEX_SQL)
+        await db.commit()
+        
+        # Tasks left running by a previous process were interrupted
+        await db.execute(FAIL_INTERRUPTED_SQL)
+        await db.commit()
+        
+        # Load recent pending tasks page by page, streaming rows straight into task instances
+        db.row_factory = aiosqlite.Row
+        fromiso = datetime.fromisoformat
+        new_task = ScheduledTask.__new__
+        last_key = ((datetime.now() - RECOVERY_WINDOW).isoformat(), '')
+        while True:
+            page_rows = 0
+            async with db.execute(SELECT_PENDING_PAGE_SQL, (*last_key, RECOVERY_PAGE_SIZE)) as cursor:
+                async for row in cursor:
+                    page_rows += 1
+                    last_key = (row['schedule_time'], row['id'])
+                    task = new_task(ScheduledTask)
+                    task.__dict__.update(
+                        id=row['id'],
+                        video_url=row['video_url'],
+                        views=row['views'],
+                        schedule_time=fromiso(row['schedule_time']),
+                        interval_minutes=row['interval_minutes'],
+                        recurring=bool(row['recurring']),
+                        status=row['status'],
+                        priority=row['priority'],
+                        user_id=row['user_id'],
+                        created_at=fromiso(row['created_at']),
+                        completed_at=fromiso(row['completed_at']) if row['completed_at'] else None,
+                        config_id=None,
+                        _schedule_iso=row['schedule_time']
                     )
                     self.tasks[task.id] = task
-                    
+                    self._counts[task.status] += 1
+                    self._by_user[task.user_id].append(task.id)
+                    heapq.heappush(self._heap, (task.schedule_time, -task.priority, task.id))
+            if page_rows < RECOVERY_PAGE_SIZE:
+                break
+        
+        self._writer = asyncio.create_task(self._writer_loop())
         logger.info(f"Loaded {len(self.tasks)} tasks from database")
     
     async def start(self):
         """Start the scheduler"""
         self.running = True
+        self._sem = asyncio.Semaphore(self.max_workers)
         self.scheduler_task = asyncio.create_task(self._scheduler_loop())
         logger.info("Task scheduler started")
         
@@ -91,6 +167,27 @@ class TaskScheduler:
         self.running = False
         if self.scheduler_task:
             self.scheduler_task.cancel()
+        
+        # Interrupt running executions so none queue writes after the connection closes;
+        # tasks left 'running' are marked failed on the next initialize
+        for execution in list(self._inflight):
+            execution.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        
+        # Release the shared balancer's connections
+        if self._balancer is not None and hasattr(self._balancer, 'close'):
+            await self._balancer.close()
+        self._balancer = None
+        
+        # Flush pending writes before closing the connection
+        if self._writer:
+            await self._write_q.join()
+            self._writer.cancel()
+            self._writer = None
+        if self._db:
+            await self._db.close()
+            self._db = None
         logger.info("Task scheduler stopped")
     
     async def schedule_view_task(self, video_url: str, views: int, 
@@ -98,9 +195,10 @@ class TaskScheduler:
                                interval_minutes: int = None,
                                recurring: bool = False,
                                priority: int = 5,
-                               user_id: str = None) -> str:
+                               user_id: str = None,
+                               config_id: int = None) -> str:
         """Schedule a new view task"""
-        task_id = str(uuid.uuid4())[:8]
+        task_id = f"{self._id_prefix}{next(self._id_ctr):08x}"
         
         if schedule_time is None:
             schedule_time = datetime.now() + timedelta(minutes=5)
@@ -113,11 +211,15 @@ class TaskScheduler:
             interval_minutes=interval_minutes,
             recurring=recurring,
             priority=priority,
-            user_id=user_id
+            user_id=user_id,
+            config_id=config_id
         )
         
         self.tasks[task_id] = task
-        await self.task_queue.put((-priority, task))
+        self._counts[task.status] += 1
+        self._by_user[user_id].append(task_id)
+        heapq.heappush(self._heap, (schedule_time, -priority, task_id))
+        self._wake.set()
         
         # Save to database
         await self._save_task(task)
@@ -131,21 +233,21 @@ class TaskScheduler:
             try:
                 now = datetime.now()
                 
-                # Check for tasks to execute
-                for task_id, task in list(self.tasks.items()):
-                    if task.status == "pending" and task.schedule_time <= now:
-                        await self._execute_task(task)
+                # Dispatch every due task, earliest and highest priority first
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, task_id = heapq.heappop(self._heap)
+                    task = self.tasks.get(task_id)
+                    if task and task.status == "pending":
+                        self._dispatch(task)
                 
-                # Process priority queue
-                if not self.task_queue.empty():
-                    try:
-                        _, task = await asyncio.wait_for(self.task_queue.get(), timeout=1)
-                        if task.status == "pending" and task.schedule_time <= now:
-                            await self._execute_task(task)
-                    except asyncio.TimeoutError:
-                        pass
-                
-                await asyncio.sleep(10)  # Check every 10 seconds
+                # Sleep until the next task is due or the schedule changes
+                delay = max(0.0, (self._heap[0][0] - datetime.now()).total_seconds()) if self._heap else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._wake.clear()
                 
             except asyncio.CancelledError:
                 break
@@ -153,18 +255,48 @@ class TaskScheduler:
                 logger.error(f"Scheduler error: {e}")
                 await asyncio.sleep(30)
     
+    def _dispatch(self, task: ScheduledTask):
+        """Run a task in the background without blocking the scheduler"""
+        execution = asyncio.create_task(self._run_task(task))
+        self._inflight.add(execution)
+        execution.add_done_callback(self._inflight.discard)
+    
+    async def _run_task(self, task: ScheduledTask):
+        """Execute a task under the worker limit, then schedule its next run"""
+        ran = False
+        try:
+            async with self._sem:
+                # A task cancelled while waiting for a worker slot is never run
+                if task.status != "pending":
+                    return
+                ran = True
+                await self._execute_task(task)
+        finally:
+            # Recurring tasks are rescheduled even when this run failed, unless cancelled
+            if (ran and self.running and task.recurring and task.interval_minutes
+                    and task.status != "cancelled"):
+                next_time = datetime.now() + timedelta(minutes=task.interval_minutes)
+                new_task_id = await self.schedule_view_task(
+                    video_url=task.video_url,
+                    views=task.views,
+                    schedule_time=next_time,
+                    interval_minutes=task.interval_minutes,
+                    recurring=True,
+                    priority=task.priority,
+                    user_id=task.user_id,
+                    config_id=task.config_id
+                )
+                logger.info(f"🔄 Recurring task scheduled: {new_task_id} at {next_time}")
+    
     async def _execute_task(self, task: ScheduledTask):
         """Execute a scheduled task"""
         try:
-            task.status = "running"
+            self._set_status(task, "running")
             await self._update_task_status(task.id, "running")
             
-            # Import load balancer
-            from tiktok_engine.workers.load_balancer import ViewLoadBalancer
-            
             logger.info(f"🚀 Executing task {task.id}: {task.views} views for {task.video_url}")
             
-            balancer = ViewLoadBalancer()
+            balancer = await self._get_balancer()
             
             # Send views
             result = await balancer.send_views(
@@ -173,93 +305,123 @@ class TaskScheduler:
                 priority=task.priority
             )
             
-            task.status = "completed"
-            task.completed_at = datetime.now()
-            await self._update_task_status(task.id, "completed", task.completed_at)
+            # Keep a cancellation made while the views were being sent
+            if task.status == "running":
+                self._set_status(task, "completed")
+                task.completed_at = datetime.now()
+                await self._update_task_status(task.id, "completed", task.completed_at)
             
             logger.info(f"✅ Task {task.id} completed: {result.get('successful_views', 0)} views sent")
             
-            # Handle recurring tasks
-            if task.recurring and task.interval_minutes:
-                next_time = datetime.now() + timedelta(minutes=task.interval_minutes)
-                new_task_id = await self.schedule_view_task(
-                    video_url=task.video_url,
-                    views=task.views,
-                    schedule_time=next_time,
-                    interval_minutes=task.interval_minutes,
-                    recurring=True,
-                    priority=task.priority,
-                    user_id=task.user_id
-                )
-                logger.info(f"🔄 Recurring task scheduled: {new_task_id} at {next_time}")
+            if self.optimizer is not None and task.config_id is not None:
+                self.optimizer.report(task.config_id, result.get('successful_views', 0), task.views)
                 
         except Exception as e:
-            task.status = "failed"
-            await self._update_task_status(task.id, "failed")
+            if task.status == "running":
+                self._set_status(task, "failed")
+                await self._update_task_status(task.id, "failed")
             logger.error(f"❌ Task {task.id} failed: {e}")
     
-    async def _save_task(self, task: ScheduledTask):
-        """Save task to database"""
+    def _set_status(self, task: ScheduledTask, status: str):
+        """Change a task's status and keep the status counts in step"""
+        self._counts[task.status] -= 1
+        task.status = status
+        self._counts[status] += 1
+    
+    async def _writer_loop(self):
+        """Drain queued writes and commit them in batches"""
+        loop = asyncio.get_running_loop()
+        while True:
+            ops = [await self._write_q.get()]
+            deadline = loop.time() + WRITE_BATCH_WINDOW
+            while len(ops) < WRITE_BATCH_SIZE:
+                try:
+                    ops.append(self._write_q.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        ops.append(await asyncio.wait_for(self._write_q.get(), timeout=remaining))
+                    except asyncio.TimeoutError:
+                        break
+            
+            try:
+                # Runs of the same statement go out as one executemany, in order
+                for sql, group in itertools.groupby(ops, key=lambda op: op[0]):
+                    await self._db.executemany(sql, [params for _, params in group])
+                await self._db.commit()
+            except Exception as e:
+                logger.error(f"Batched task write failed, retrying one by one: {e}")
+                await self._write_individually(ops)
+            finally:
+                for _ in ops:
+                    self._write_q.task_done()
+    
+    async def _write_individually(self, ops: List[Tuple[str, tuple]]):
+        """Roll back a failed batch and apply its writes one at a time"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                await db.execute('''
-                    INSERT INTO scheduled_tasks 
-                    (id, video_url, views, schedule_time, interval_minutes, recurring, status, priority, user_id, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    task.id,
-                    task.video_url,
-                    task.views,
-                    task.schedule_time.isoformat(),
-                    task.interval_minutes,
-                    1 if task.recurring else 0,
-                    task.status,
-                    task.priority,
-                    task.user_id,
-                    task.created_at.isoformat()
-                ))
-                await db.commit()
+            await self._db.rollback()
+            for sql, params in ops:
+                try:
+                    await self._db.execute(sql, params)
+                except Exception as e:
+                    logger.error(f"Failed to write task: {e}")
+            await self._db.commit()
         except Exception as e:
-            logger.error(f"Failed to save task: {e}")
+            logger.error(f"Failed to write tasks: {e}")
+    
+    async def _get_balancer(self):
+        """Get the shared load balancer, creating it on first use"""
+        if self._balancer is None:
+            from tiktok_engine.workers.load_balancer import ViewLoadBalancer
+            
+            balancer = ViewLoadBalancer()
+            if hasattr(balancer, 'warmup'):
+                await balancer.warmup()
+            self._balancer = balancer
+        return self._balancer
+    
+    async def _save_task(self, task: ScheduledTask):
+        """Queue task insert for the writer"""
+        self._write_q.put_nowait((INSERT_TASK_SQL, (
+            task.id,
+            task.video_url,
+            task.views,
+            task._schedule_iso,
+            task.interval_minutes,
+            1 if task.recurring else 0,
+            task.status,
+            task.priority,
+            task.user_id,
+            task.created_at.isoformat()
+        )))
     
     async def _update_task_status(self, task_id: str, status: str, completed_at: datetime = None):
-        """Update task status in database"""
-        try:
-            async with aiosqlite.connect(self.db_path) as db:
-                if completed_at:
-                    await db.execute('''
-                        UPDATE scheduled_tasks 
-                        SET status = ?, completed_at = ?
-                        WHERE id = ?
-                    ''', (status, completed_at.isoformat(), task_id))
-                else:
-                    await db.execute('''
-                        UPDATE scheduled_tasks 
-                        SET status = ?
-                        WHERE id = ?
-                    ''', (status, task_id))
-                await db.commit()
-        except Exception as e:
-            logger.error(f"Failed to update task status: {e}")
+        """Queue task status update for the writer"""
+        if completed_at:
+            self._write_q.put_nowait((UPDATE_COMPLETED_SQL, (status, completed_at.isoformat(), task_id)))
+        else:
+            self._write_q.put_nowait((UPDATE_STATUS_SQL, (status, task_id)))
     
     def get_task(self, task_id: str) -> Optional[Dict]:
         """Get task by ID"""
         task = self.tasks.get(task_id)
         if task:
-            return asdict(task)
+            return task.to_dict_fast()
         return None
     
     def get_user_tasks(self, user_id: str) -> List[Dict]:
         """Get all tasks for a user"""
-        return [asdict(task) for task in self.tasks.values() 
-                if task.user_id == user_id]
+        return [self.tasks[task_id].to_dict_fast() for task_id in self._by_user.get(user_id, ())]
     
     async def cancel_task(self, task_id: str) -> bool:
         """Cancel a scheduled task"""
         if task_id in self.tasks:
             task = self.tasks[task_id]
             if task.status in ["pending", "running"]:
-                task.status = "cancelled"
+                self._set_status(task, "cancelled")
+                self._wake.set()
                 await self._update_task_status(task_id, "cancelled")
                 logger.info(f"Task {task_id} cancelled")
                 return True
@@ -268,9 +430,9 @@ class TaskScheduler:
     def get_stats(self) -> Dict:
         """Get scheduler statistics"""
         total = len(self.tasks)
-        pending = sum(1 for t in self.tasks.values() if t.status == "pending")
-        running = sum(1 for t in self.tasks.values() if t.status == "running")
-        completed = sum(1 for t in self.tasks.values() if t.status == "completed")
+        pending = self._counts["pending"]
+        running = self._counts["running"]
+        completed = self._counts["completed"]
         
         return {
             "total_tasks": total,
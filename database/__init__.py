@@ -1,14 +1,21 @@
 """
 Database Package Initialization
 """
-from .models import (
-    Base, User, Order, Transaction, Analytics, TikTokAccount, Proxy,
-    ViewLog, SystemLog, Setting, DailyAnalytics, UserAnalytics,
-    OrderAnalytics, PerformanceAnalytics, RevenueAnalytics, GeographicAnalytics,
-    PaymentGateway, PaymentMethod, Invoice, CryptoPayment, Subscription,
-    SubscriptionInvoice, PaymentWebhook, Refund,
-    init_database, get_db
-)
+import importlib
+from pathlib import Path
+
+# Exported names resolve lazily (PEP 562) so `import database` does not pull in
+# SQLAlchemy and model registration until a model is actually used
+_LAZY = {
+    name: '.models' for name in (
+        'Base', 'User', 'Order', 'Transaction', 'Analytics', 'TikTokAccount', 'Proxy',
+        'ViewLog', 'SystemLog', 'Setting', 'DailyAnalytics', 'UserAnalytics',
+        'OrderAnalytics', 'PerformanceAnalytics', 'RevenueAnalytics', 'GeographicAnalytics',
+        'PaymentGateway', 'PaymentMethod', 'Invoice', 'CryptoPayment', 'Subscription',
+        'SubscriptionInvoice', 'PaymentWebhook', 'Refund',
+        'get_db'
+    )
+}
 
 __all__ = [
     'Base',
@@ -39,16 +46,32 @@ __all__ = [
     'get_db'
 ]
 
-# Initialize database on import
-import os
-from pathlib import Path
+_dirs_ready = False
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
 
-# Create database directory
-db_dir = Path("database")
-db_dir.mkdir(exist_ok=True)
 
-# Create sessions and analytics directories
-(db_dir / "sessions").mkdir(exist_ok=True)
-(db_dir / "analytics").mkdir(exist_ok=True)
+def init_database(db_url=None):
+    """Create the database directories once, then initialize the models"""
+    global _dirs_ready
+    if not _dirs_ready:
+        # Create database, sessions and analytics directories
+        db_dir = Path("database")
+        db_dir.mkdir(exist_ok=True)
+        (db_dir / "sessions").mkdir(exist_ok=True)
+        (db_dir / "analytics").mkdir(exist_ok=True)
+        _dirs_ready = True
+        print("📦 Database package initialized successfully")
 
-print("📦 Database package initialized successfully")
\ No newline at end of file
+    from .models import init_database as init_models
+    return init_models(db_url)
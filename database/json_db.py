@@ -2,19 +2,30 @@
 JSON Database Manager - Simple file-based storage
 """
 
+import atexit
+import copy
 import json
 import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 import threading
 
+# Writes are coalesced and flushed to disk this many seconds after the first change
+FLUSH_DELAY = 0.5
+
 class JSONDatabase:
     """JSON file-based database manager"""
     
     def __init__(self, db_path: str = "database/data.json"):
         self.db_path = db_path
         self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._cache: Dict = self._read_file()
         self.ensure_db_exists()
+        # Pending writes reach disk on interpreter exit
+        atexit.register(self.flush)
     
     def ensure_db_exists(self):
         """Ensure database file exists"""
@@ -30,168 +41,189 @@ class JSONDatabase:
                     'last_updated': datetime.now().isoformat()
                 }
             }
-            self.save_data(default_data)
+            with self.lock:
+                self._cache = default_data
+                self._dirty = True
+            self.flush()
             print("✅ JSON database created")
     
+    def _read_file(self) -> Dict:
+        """Read the JSON file once into memory"""
+        try:
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+    
     def load_data(self) -> Dict:
-        """Load data from JSON file"""
+        """Get a copy of the in-memory data"""
         with self.lock:
-            try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                return {}
+            return copy.deepcopy(self._cache)
     
     def save_data(self, data: Dict):
-        """Save data to JSON file"""
+        """Replace the in-memory data and schedule a flush"""
         with self.lock:
-            # Update metadata
-            if 'metadata' in data:
-                data['metadata']['last_updated'] = datetime.now().isoformat()
+            self._cache = data
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        """Debounce a disk write; caller holds self.lock"""
+        self._dirty = True
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def flush(self):
+        """Write the in-memory data to disk atomically"""
+        with self._flush_lock:
+            with self.lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                
+                # Update metadata
+                if 'metadata' in self._cache:
+                    self._cache['metadata']['last_updated'] = datetime.now().isoformat()
+                
+                # Serialize under the lock since mutators change the cache in place
+                payload = json.dumps(self._cache, ensure_ascii=False, separators=(',', ':'))
+                self._dirty = False
             
-            with open(self.db_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            tmp_path = f"{self.db_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.db_path)
     
     def insert_view_session(self, session_data: Dict) -> str:
         """Insert view session"""
-        data = self.load_data()
-        
-        # Generate session ID
-        session_id = f"session_{datetime.now().timestamp()}_{len(data['view_sessions'])}"
-        session_data['id'] = session_id
-        session_data['created_at'] = datetime.now().isoformat()
-        session_data['status'] = 'pending'
-        
-        data['view_sessions'].append(session_data)
-        self.save_data(data)
+        with self.lock:
+            sessions = self._cache['view_sessions']
+            
+            # Generate session ID
+            session_id = f"session_{datetime.now().timestamp()}_{len(sessions)}"
+            session_data['id'] = session_id
+            session_data['created_at'] = datetime.now().isoformat()
+            session_data['status'] = 'pending'
+            
+            sessions.append(session_data)
+            self._schedule_flush()
         
         return session_id
     
     def update_view_session(self, session_id: str, updates: Dict) -> bool:
         """Update view session"""
-        data = self.load_data()
-        
-        for i, session in enumerate(data['view_sessions']):
-            if session.get('id') == session_id:
-                data['view_sessions'][i].update(updates)
-                data['view_sessions'][i]['updated_at'] = datetime.now().isoformat()
-                self.save_data(data)
-                return True
+        with self.lock:
+            for session in self._cache['view_sessions']:
+                if session.get('id') == session_id:
+                    session.update(updates)
+                    session['updated_at'] = datetime.now().isoformat()
+                    self._schedule_flush()
+                    return True
         
         return False
     
     def get_view_session(self, session_id: str) -> Optional[Dict]:
         """Get view session by ID"""
-        data = self.load_data()
-        
-        for session in data['view_sessions']:
-            if session.get('id') == session_id:
-                return session
+        with self.lock:
+            for session in self._cache['view_sessions']:
+                if session.get('id') == session_id:
+                    return copy.deepcopy(session)
         
         return None
     
     def get_active_accounts(self, limit: int = 10) -> List[Dict]:
         """Get active accounts"""
-        data = self.load_data()
-        
-        active_accounts = [
-            acc for acc in data.get('accounts', [])
-            if acc.get('status', 'active') == 'active'
-        ]
-        
-        # Sort by last used (oldest first)
-        active_accounts.sort(key=lambda x: x.get('last_used', '1970-01-01'))
-        
-        return active_accounts[:limit]
+        with self.lock:
+            active_accounts = [
+                acc for acc in self._cache.get('accounts', [])
+                if acc.get('status', 'active') == 'active'
+            ]
+            
+            # Sort by last used (oldest first)
+            active_accounts.sort(key=lambda x: x.get('last_used', '1970-01-01'))
+            
+            return copy.deepcopy(active_accounts[:limit])
     
     def update_account_usage(self, username: str, views_sent: int = 1):
         """Update account usage"""
-        data = self.load_data()
-        
-        for i, account in enumerate(data.get('accounts', [])):
-            if account.get('username') == username:
-                current_views = account.get('views_sent', 0)
-                data['accounts'][i]['views_sent'] = current_views + views_sent
-                data['accounts'][i]['last_used'] = datetime.now().isoformat()
-                self.save_data(data)
-                return True
+        with self.lock:
+            for account in self._cache.get('accounts', []):
+                if account.get('username') == username:
+                    account['views_sent'] = account.get('views_sent', 0) + views_sent
+                    account['last_used'] = datetime.now().isoformat()
+                    self._schedule_flush()
+                    return True
         
         return False
     
     def get_proxies(self, min_success_rate: float = 0.5, limit: int = 20) -> List[Dict]:
         """Get proxies with minimum success rate"""
-        data = self.load_data()
-        
-        proxies = [
-            proxy for proxy in data.get('proxies', [])
-            if proxy.get('success_rate', 0) >= min_success_rate
-            and proxy.get('status', 'active') == 'active'
-        ]
-        
-        # Sort by success rate (highest first)
-        proxies.sort(key=lambda x: x.get('success_rate', 0), reverse=True)
-        
-        return proxies[:limit]
+        with self.lock:
+            proxies = [
+                proxy for proxy in self._cache.get('proxies', [])
+                if proxy.get('success_rate', 0) >= min_success_rate
+                and proxy.get('status', 'active') == 'active'
+            ]
+            
+            # Sort by success rate (highest first)
+            proxies.sort(key=lambda x: x.get('success_rate', 0), reverse=True)
+            
+            return copy.deepcopy(proxies[:limit])
     
     def update_proxy_stats(self, proxy_url: str, success: bool):
         """Update proxy statistics"""
-        data = self.load_data()
-        
-        proxy_found = False
-        for i, proxy in enumerate(data.get('proxies', [])):
-            if proxy.get('proxy_url') == proxy_url:
-                proxy_found = True
-                
-                # Calculate new success rate
-                old_rate = proxy.get('success_rate', 0.5)
-                total_req = proxy.get('total_requests', 0)
-                new_total = total_req + 1
-                
-                if success:
-                    new_rate = (old_rate * total_req + 1) / new_total
-                else:
-                    new_rate = (old_rate * total_req) / new_total
-                
-                data['proxies'][i]['success_rate'] = new_rate
-                data['proxies'][i]['total_requests'] = new_total
-                data['proxies'][i]['last_used'] = datetime.now().isoformat()
-                break
-        
-        if not proxy_found:
-            # Add new proxy
-            new_proxy = {
-                'proxy_url': proxy_url,
-                'success_rate': 1.0 if success else 0.0,
-                'total_requests': 1,
-                'last_used': datetime.now().isoformat(),
-                'status': 'active'
-            }
-            data['proxies'].append(new_proxy)
-        
-        self.save_data(data)
+        with self.lock:
+            proxies = self._cache.get('proxies', [])
+            
+            for proxy in proxies:
+                if proxy.get('proxy_url') == proxy_url:
+                    # Calculate new success rate
+                    old_rate = proxy.get('success_rate', 0.5)
+                    total_req = proxy.get('total_requests', 0)
+                    new_total = total_req + 1
+                    
+                    if success:
+                        new_rate = (old_rate * total_req + 1) / new_total
+                    else:
+                        new_rate = (old_rate * total_req) / new_total
+                    
+                    proxy['success_rate'] = new_rate
+                    proxy['total_requests'] = new_total
+                    proxy['last_used'] = datetime.now().isoformat()
+                    break
+            else:
+                # Add new proxy
+                new_proxy = {
+                    'proxy_url': proxy_url,
+                    'success_rate': 1.0 if success else 0.0,
+                    'total_requests': 1,
+                    'last_used': datetime.now().isoformat(),
+                    'status': 'active'
+                }
+                self._cache['proxies'].append(new_proxy)
+            
+            self._schedule_flush()
     
     def save_analytics(self, analytics_data: Dict):
         """Save analytics data"""
-        data = self.load_data()
-        
         # Add date if not present
         if 'date' not in analytics_data:
             analytics_data['date'] = datetime.now().date().isoformat()
         
-        data['analytics'].append(analytics_data)
-        self.save_data(data)
+        with self.lock:
+            self._cache['analytics'].append(analytics_data)
+            self._schedule_flush()
     
     def get_settings(self) -> Dict:
         """Get settings"""
-        data = self.load_data()
-        return data.get('settings', {})
+        with self.lock:
+            return copy.deepcopy(self._cache.get('settings', {}))
     
     def update_settings(self, new_settings: Dict):
         """Update settings"""
-        data = self.load_data()
-        
-        if 'settings' not in data:
-            data['settings'] = {}
-        
-        data['settings'].update(new_settings)
-        self.save_data(data)
\ No newline at end of file
+        with self.lock:
+            self._cache.setdefault('settings', {}).update(new_settings)
+            self._schedule_flush()
@@ -0,0 +1,157 @@
+"""
+Unit Tests for VT ULTRA PRO Security System
+"""
+import unittest
+import sys
+import os
+import time
+import base64
+import json
+import hmac
+import hashlib
+from unittest.mock import patch
+
+import jwt
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.security import RATE_LIMIT_SHARD_SIZE, SecuritySystem
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _sign_raw(secret: bytes, header: dict, payload) -> str:
+    """Sign arbitrary header/payload JSON without PyJWT's own validation"""
+    signing_input = f"{_b64(json.dumps(header).encode())}.{_b64(json.dumps(payload).encode())}"
+    signature = hmac.new(secret, signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(signature)}"
+
+
+class TestJWTBatchVerification(unittest.TestCase):
+    """Batch JWT verification must agree with the single-token path"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.security = SecuritySystem('test-secret-key-' * 2)
+        self.secret = self.security.secret_key
+        self.now = int(time.time())
+        self.header = {'alg': 'HS256', 'typ': 'JWT'}
+    
+    def _tokens(self):
+        now = self.now
+        return {
+            'valid': self.security.create_jwt_token('user1'),
+            'refresh': self.security.create_refresh_token('user2'),
+            'future_iat': jwt.encode({'user_id': 'x', 'iat': now + 10000, 'exp': now + 20000}, self.secret, algorithm='HS256'),
+            'string_iat': _sign_raw(self.secret, self.header, {'user_id': 'x', 'iat': 'soon', 'exp': now + 100}),
+            'expired': jwt.encode({'user_id': 'x', 'exp': now - 10}, self.secret, algorithm='HS256'),
+            'future_nbf': jwt.encode({'user_id': 'x', 'nbf': now + 10000}, self.secret, algorithm='HS256'),
+            'audience': jwt.encode({'user_id': 'x', 'aud': 'other'}, self.secret, algorithm='HS256'),
+            'wrong_key': jwt.encode({'user_id': 'x'}, b'other-secret', algorithm='HS256'),
+            'none_alg': _sign_raw(self.secret, {'alg': 'none'}, {'user_id': 'x'}),
+            'list_payload': _sign_raw(self.secret, self.header, [1, 2]),
+            'non_str_typ': _sign_raw(self.secret, {'alg': 'HS256', 'typ': 5}, {'user_id': 'x'}),
+            'crit_header': _sign_raw(self.secret, {'alg': 'HS256', 'crit': ['b64']}, {'user_id': 'x'}),
+            'tampered': self.security.create_jwt_token('user1')[:-4] + 'AAAA',
+            'extra_segment': self.security.create_jwt_token('user1') + '.x',
+            'garbage': 'not-a-token',
+        }
+    
+    def test_batch_matches_single_token_path(self):
+        """Every token gets the same verdict from both paths"""
+        tokens = self._tokens()
+        names = list(tokens)
+        batch = self.security.verify_jwt_tokens_batch([tokens[name] for name in names])
+        
+        for name, batch_result in zip(names, batch):
+            with self.subTest(token=name):
+                single = SecuritySystem('test-secret-key-' * 2).verify_jwt_token(tokens[name])
+                self.assertEqual(batch_result, single)
+        
+        self.assertIsNotNone(batch[names.index('valid')])
+        self.assertIsNone(batch[names.index('future_iat')])
+    
+    def test_batch_does_not_poison_single_token_cache(self):
+        """A batch call never makes the single-token path accept a token"""
+        tokens = self._tokens()
+        self.security.verify_jwt_tokens_batch(list(tokens.values()))
+        
+        for name in ('future_iat', 'string_iat', 'crit_header', 'non_str_typ'):
+            with self.subTest(token=name):
+                self.assertIsNone(self.security.verify_jwt_token(tokens[name]))
+
+    
+    def test_cached_payload_is_not_shared(self):
+        """Mutating a returned payload never changes later verifications"""
+        token = self.security.create_jwt_token('user1')
+        first = self.security.verify_jwt_token(token)
+        first['user_id'] = 'attacker'
+        
+        cached = self.security.verify_jwt_token(token)
+        self.assertEqual(cached['user_id'], 'user1')
+        cached['request_id'] = 'abc'
+        
+        batch = self.security.verify_jwt_tokens_batch([token])[0]
+        self.assertEqual(batch['user_id'], 'user1')
+        self.assertNotIn('request_id', batch)
+        self.assertNotIn('request_id', self.security.verify_jwt_token(token))
+
+
+class TestRateLimitShards(unittest.TestCase):
+    """Rate-limit state must survive pressure on its shard"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.security = SecuritySystem('test-secret-key-' * 2)
+        self.security.config['rate_limit_requests'] = 3
+        self.throttled_ip = '10.0.0.1'
+        self.shard = self.security._bucket_shard(self.throttled_ip)[1]
+    
+    def _same_shard_ips(self, count):
+        ips = []
+        n = 0
+        while len(ips) < count:
+            n += 1
+            ip = f"172.16.{n // 256}.{n % 256}"
+            if self.security._bucket_shard(ip)[1] is self.shard:
+                ips.append(ip)
+        return ips
+    
+    def _throttle(self):
+        for _ in range(3):
+            self.security.record_request(self.throttled_ip, '/api')
+        allowed, _ = self.security.check_rate_limit(self.throttled_ip, '/api')
+        self.assertFalse(allowed)
+    
+    def test_filling_shard_keeps_throttled_ip_throttled(self):
+        """Rotating many IPs through one shard cannot evict a throttled bucket"""
+        self._throttle()
+        
+        for ip in self._same_shard_ips(RATE_LIMIT_SHARD_SIZE * 2):
+            self.security.record_request(ip, '/api')
+        
+        allowed, info = self.security.check_rate_limit(self.throttled_ip, '/api')
+        self.assertFalse(allowed)
+        self.assertEqual(info['reason'], 'rate_limit_exceeded')
+    
+    def test_refilled_ips_are_evicted_past_shard_cap(self):
+        """Once buckets have refilled, the shard shrinks back to its cap"""
+        self._throttle()
+        *ips, last_ip = self._same_shard_ips(RATE_LIMIT_SHARD_SIZE + 1)
+        start = time.time()
+        with patch('core.security.time.time', return_value=start):
+            for ip in ips:
+                self.security.record_request(ip, '/api')
+        self.assertGreater(len(self.shard), RATE_LIMIT_SHARD_SIZE)
+        
+        later = start + self.security.config['rate_limit_period'] + 1
+        with patch('core.security.time.time', return_value=later):
+            self.security.record_request(last_ip, '/api')
+        self.assertLessEqual(len(self.shard), RATE_LIMIT_SHARD_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()